@@ -0,0 +1,109 @@
+import os
+import tarfile
+import time
+import zipfile
+from functools import lru_cache
+
+
+def is_archive(path):
+    '''
+    check if the raw data path is a zip or tar archive instead of a directory
+    :param path: local path to data directory or archive
+    :return: True for zip and (compressed) tar files
+    '''
+    assert isinstance(path, str)
+
+    return os.path.isfile(path) and (zipfile.is_zipfile(path) or tarfile.is_tarfile(path))
+
+
+@lru_cache(maxsize=4)
+def _archive_index(path, size, mtime):
+    # the archive is only indexed again when it is replaced
+    index = {}
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir():
+                    index[os.path.basename(info.filename)] = {
+                        'size': info.file_size, 'mtime': list(info.date_time), 'crc': info.CRC}
+    else:
+        # reading the headers of a compressed tar decompresses it once
+        with tarfile.open(path, 'r|*') as tf:
+            for member in tf:
+                if member.isfile():
+                    index[os.path.basename(member.name)] = {'size': member.size, 'mtime': member.mtime}
+    return index
+
+
+def archive_index(path):
+    '''
+    sizes, modification times and (for zip files) crc32 checksums of the archive members,
+    read from the archive headers without extracting anything
+    :param path: should be valid path to a zip or tar archive
+    :return: dictionary of member file name -> signature, in the order of the archive
+    '''
+    stat = os.stat(path)
+    return _archive_index(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def iter_members(path, names=None):
+    '''
+    Generator over the content of the archive members, in the order of the archive, the
+    archive is read front to back so compressed tar files are only decompressed once
+    :param path: should be valid path to a zip or tar archive
+    :param names: set of member file names to read, default is every member
+    :return: yields (member file name, bytes)
+    '''
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                name = os.path.basename(info.filename)
+                if not info.is_dir() and (names is None or name in names):
+                    yield name, zf.read(info)
+    else:
+        with tarfile.open(path, 'r|*') as tf:
+            for member in tf:
+                name = os.path.basename(member.name)
+                if member.isfile() and (names is None or name in names):
+                    yield name, tf.extractfile(member).read()
+
+
+def iter_match_pairs(path, files, stats=None):
+    '''
+    Generator pairing the <id>.csv and <id>_info.csv members of a match as they are read
+    from the archive, only the members of matches which are not complete yet are buffered
+    :param path: should be valid path to a zip or tar archive
+    :param files: <id>.csv member names of the matches to read
+    :param stats: IngestStats, the time spent reading the archive is added to the read stage
+    :return: yields (<id>.csv name, (info bytes, csv bytes)) once both members of a match are read,
+    matches without an info member are yielded with None for it at the end
+    '''
+    names = set(files) | {f"{file[:-4]}_info.csv" for file in files}
+
+    # match id -> {'info': bytes, 'csv': bytes} of the members read so far
+    pending = {}
+    members = iter_members(path, names)
+    while True:
+        start = time.perf_counter()
+        member = next(members, None)
+        if stats is not None:
+            stats.add_time('read', time.perf_counter() - start)
+        if member is None:
+            break
+
+        name, data = member
+        if name.endswith('_info.csv'):
+            match_id, kind = name[:-9], 'info'
+        else:
+            match_id, kind = name[:-4], 'csv'
+        pair = pending.setdefault(match_id, {})
+        pair[kind] = data
+
+        if len(pair) == 2:
+            del pending[match_id]
+            yield f"{match_id}.csv", (pair['info'], pair['csv'])
+
+    # the ball by ball files without an info file fail like missing files in a directory
+    for match_id, pair in pending.items():
+        if 'csv' in pair:
+            yield f"{match_id}.csv", (None, pair['csv'])
@@ -0,0 +1,202 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+# column name -> dtype of the fixed width ball by ball arrays
+BALL_COLUMNS = {
+    'innings': np.int8,
+    'over': np.int8,
+    'ball': np.int8,
+    'runs_off_bat': np.int8,
+    'extras': np.int8,
+    'wides': np.int8,
+    'noballs': np.int8,
+    'wicket': np.int8,
+    # dictionary encoded names, see players.json and teams.json
+    'striker': np.int32,
+    'bowler': np.int32,
+    'batting_team': np.int16,
+    'bowling_team': np.int16,
+}
+
+# files of the match_id -> (start, end) offset index
+INDEX_COLUMNS = ['match_id', 'start', 'end']
+
+
+def _encode(values, codes):
+    '''
+    dictionary encode a column of names
+    :param values: names to encode
+    :param codes: dictionary of name -> code, new names are added to it
+    :return: numpy array of codes
+    '''
+    return np.fromiter((codes.setdefault(value, len(codes)) for value in values),
+                       dtype=np.int64, count=len(values))
+
+
+def read_balls(path, players, teams):
+    '''
+    Read the ball by ball data of a match into fixed width arrays
+    :param path: should be valid path to the <id>.csv file
+    :param players: dictionary of player name -> code, new players are added to it
+    :param teams: dictionary of team name -> code, new teams are added to it
+    :return: (match id, dictionary of column -> numpy array)
+    '''
+    assert isinstance(path, str)
+
+    dataframe = pd.read_csv(path, dtype={'ball': str},
+                            usecols=['match_id', 'innings', 'ball', 'batting_team', 'bowling_team',
+                                     'striker', 'bowler', 'runs_off_bat', 'extras', 'wides',
+                                     'noballs', 'wicket_type'])
+
+    # ball is written as <over>.<ball>, eg. 19.10 is the tenth delivery of the last over
+    over_ball = dataframe['ball'].str.split('.', expand=True)
+
+    columns = {
+        'innings': dataframe['innings'],
+        'over': over_ball[0].astype(int),
+        'ball': over_ball[1].astype(int),
+        'runs_off_bat': dataframe['runs_off_bat'],
+        'extras': dataframe['extras'],
+        'wides': dataframe['wides'].fillna(0),
+        'noballs': dataframe['noballs'].fillna(0),
+        'wicket': dataframe['wicket_type'].notna(),
+        'striker': _encode(dataframe['striker'], players),
+        'bowler': _encode(dataframe['bowler'], players),
+        'batting_team': _encode(dataframe['batting_team'], teams),
+        'bowling_team': _encode(dataframe['bowling_team'], teams),
+    }
+    columns = {column: np.asarray(values).astype(BALL_COLUMNS[column]) for column, values in columns.items()}
+
+    return int(dataframe['match_id'][0]), columns
+
+
+def build_ball_store(input_directory_path, store_path):
+    '''
+    Consolidate the ball by ball data of every match in the raw data directory into one
+    array per column, an existing store at store_path is replaced
+    :param input_directory_path: local path to data directory
+    :param store_path: directory of the store
+    :return: number of balls in the store
+    '''
+    assert isinstance(input_directory_path, str)
+    assert isinstance(store_path, str)
+
+    files = os.listdir(input_directory_path)
+    # check if not an info file and if not a csv file
+    files = sorted(file for file in files if file[-8:-4] != 'info' and file[-3:] == 'csv')
+
+    players = {}
+    teams = {}
+    chunks = {column: [] for column in BALL_COLUMNS}
+    index = {column: [] for column in INDEX_COLUMNS}
+
+    n = 0
+    for file in files:
+        match_id, columns = read_balls(os.path.join(input_directory_path, file), players, teams)
+        for column, values in columns.items():
+            chunks[column].append(values)
+
+        # rows of the match in the consolidated arrays
+        index['match_id'].append(match_id)
+        index['start'].append(n)
+        n += len(columns['innings'])
+        index['end'].append(n)
+
+    # write the store next to the old one and swap it in when complete
+    tmp_path = store_path + '.tmp'
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    for column, dtype in BALL_COLUMNS.items():
+        values = np.concatenate(chunks[column]) if chunks[column] else np.zeros(0, dtype=dtype)
+        np.save(os.path.join(tmp_path, column + '.npy'), values)
+    for column in INDEX_COLUMNS:
+        np.save(os.path.join(tmp_path, column + '.npy'), np.array(index[column], dtype=np.int64))
+
+    # names in the order of their codes
+    with open(os.path.join(tmp_path, 'players.json'), 'w') as f:
+        json.dump(list(players), f)
+    with open(os.path.join(tmp_path, 'teams.json'), 'w') as f:
+        json.dump(list(teams), f)
+
+    if os.path.exists(store_path):
+        shutil.rmtree(store_path)
+    os.rename(tmp_path, store_path)
+
+    return n
+
+
+class BallStore:
+    '''
+    Read only view of the consolidated ball by ball store, the column arrays are memory
+    mapped so opening the store does not read the data
+    '''
+
+    def __init__(self, store_path):
+        '''
+        :param store_path: directory of the store
+        '''
+        assert isinstance(store_path, str)
+
+        self.columns = {column: np.load(os.path.join(store_path, column + '.npy'), mmap_mode='r')
+                        for column in BALL_COLUMNS}
+
+        with open(os.path.join(store_path, 'players.json')) as f:
+            self.players = json.load(f)
+        with open(os.path.join(store_path, 'teams.json')) as f:
+            self.teams = json.load(f)
+
+        match_ids, starts, ends = [np.load(os.path.join(store_path, column + '.npy'))
+                                   for column in INDEX_COLUMNS]
+        # match_id -> (start, end) rows of the match
+        self.index = dict(zip(match_ids.tolist(), zip(starts.tolist(), ends.tolist())))
+
+    def __len__(self):
+        return len(self.columns['innings'])
+
+    def __getitem__(self, column):
+        '''
+        full column across every match of the store
+        :param column: name of the column
+        :return: memory mapped numpy array
+        '''
+        return self.columns[column]
+
+    def match(self, match_id):
+        '''
+        ball by ball data of a single match
+        :param match_id: cricsheet match id
+        :return: dictionary of column -> numpy array
+        '''
+        start, end = self.index[match_id]
+        return {column: values[start:end] for column, values in self.columns.items()}
+
+    def to_frame(self, match_id=None):
+        '''
+        ball by ball data as a dataframe with the names decoded
+        :param match_id: cricsheet match id, None returns every match
+        :return: pandas DataFrame
+        '''
+        columns = self.columns if match_id is None else self.match(match_id)
+        frame = pd.DataFrame({column: np.asarray(values) for column, values in columns.items()})
+
+        for column, names in [('striker', self.players), ('bowler', self.players),
+                              ('batting_team', self.teams), ('bowling_team', self.teams)]:
+            frame[column] = pd.Categorical.from_codes(frame[column], categories=names)
+        return frame
+
+
+if __name__ == '__main__':
+    # path to directory
+    BASE_PATH = os.getcwd()
+    DATA_PATH = os.path.join(BASE_PATH, "Raw Data", "t20s_male_csv_files")
+    # path to save location
+    STORE_PATH = os.path.join(BASE_PATH, "DataProcessing", "ball_store")
+
+    print(build_ball_store(DATA_PATH, STORE_PATH))
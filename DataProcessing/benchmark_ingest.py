@@ -0,0 +1,188 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from ingest_stats import IngestStats, peak_memory_mb
+from pre_process_data import id_csv, iter_innings, match_files, pre_process_data, write_innings_csv
+from synthetic_data import write_synthetic_data
+
+
+# ingest modes in the order they are run, incremental reuses the output of serial
+MODES = ['serial', 'no_prefetch', 'workers', 'incremental', 'streaming', 'archive', 'id_csv']
+
+DEFAULT_MATCHES = [1000, 10000, 100000]
+
+
+def data_paths(data_dir, matches, seed):
+    '''
+    location of the synthetic data set of a size
+    :param data_dir: directory holding the synthetic data sets
+    :param matches: number of matches
+    :param seed: seed of the data set
+    :return: (directory of the files, zip archive of the files)
+    '''
+    name = f'synthetic_{matches}_{seed}'
+    return os.path.join(data_dir, name), os.path.join(data_dir, name + '.zip')
+
+
+def ensure_data(data_dir, matches, seed, archive=False):
+    '''
+    write the synthetic data set of a size unless it already exists
+    :param data_dir: directory holding the synthetic data sets
+    :param matches: number of matches
+    :param seed: seed of the data set
+    :param archive: also write the zip archive of the data set
+    :return: (directory of the files, zip archive of the files)
+    '''
+    directory, archive_path = data_paths(data_dir, matches, seed)
+
+    # the data set is written under a temporary name so an interrupted run is not reused
+    if not os.path.isdir(directory):
+        write_synthetic_data(directory + '.tmp', matches, seed)
+        os.rename(directory + '.tmp', directory)
+    if archive and not os.path.isfile(archive_path):
+        write_synthetic_data(archive_path + '.tmp', matches, seed, archive=True)
+        os.rename(archive_path + '.tmp', archive_path)
+
+    return directory, archive_path
+
+
+def run_mode(mode, directory, archive_path, output_path, workers):
+    '''
+    run one ingest mode, called in a fresh process so the peak memory belongs to the mode
+    :param mode: one of MODES, or 'seed_incremental' for the incremental run writing the manifest
+    the timed incremental mode starts from
+    :param directory: directory of the synthetic files
+    :param archive_path: zip archive of the synthetic files
+    :param output_path: path of the csv file to write
+    :param workers: number of worker processes of the workers mode
+    :return: dictionary with wall time, files/sec and peak memory
+    '''
+    files = len(match_files(directory)) * 2
+
+    start = time.perf_counter()
+    # keep the summary, failure and unknown venue lines of the ingest code out of the child's output
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if mode == 'serial':
+            pre_process_data(directory, output_path)
+        elif mode == 'no_prefetch':
+            pre_process_data(directory, output_path, prefetch=0)
+        elif mode == 'workers':
+            pre_process_data(directory, output_path, workers=workers)
+        elif mode == 'incremental':
+            # nothing changed since the seed_incremental run, so only the manifest check is measured
+            pre_process_data(directory, output_path, incremental=True)
+        elif mode == 'seed_incremental':
+            pre_process_data(directory, output_path, incremental=True)
+        elif mode == 'streaming':
+            write_innings_csv(iter_innings(directory, stats=IngestStats()), output_path)
+        elif mode == 'archive':
+            pre_process_data(archive_path, output_path)
+        elif mode == 'id_csv':
+            for file in match_files(directory):
+                id_csv(os.path.join(directory, file))
+        else:
+            raise ValueError('unknown mode ' + mode)
+    wall = time.perf_counter() - start
+
+    own, children = peak_memory_mb()
+    return {'wall_seconds': round(wall, 3),
+            'files_per_second': round(files / wall, 1) if wall > 0 else None,
+            'peak_memory_mb': own,
+            'peak_worker_memory_mb': children if mode == 'workers' and workers > 1 else None}
+
+
+def benchmark(matches=None, modes=None, data_dir=None, workers=None, seed=0):
+    '''
+    Run every ingest mode on synthetic data sets of increasing size, each mode runs in its own
+    process
+    :param matches: list of data set sizes in matches, default 1k, 10k and 100k
+    :param modes: list of MODES to run, default is every mode
+    :param data_dir: directory to keep the synthetic data sets in, they are reused by later runs
+    :param workers: number of worker processes of the workers mode, default is the number of cpus
+    :param seed: seed of the data sets
+    :return: list of result dictionaries, one per data set size and mode
+    '''
+    if matches is None:
+        matches = DEFAULT_MATCHES
+    if modes is None:
+        modes = MODES
+    if data_dir is None:
+        data_dir = os.path.join(tempfile.gettempdir(), 'cricsheet_benchmark')
+    if workers is None:
+        workers = os.cpu_count() or 1
+    os.makedirs(data_dir, exist_ok=True)
+
+    results = []
+    for n in matches:
+        directory, archive_path = ensure_data(data_dir, n, seed, archive='archive' in modes)
+        with tempfile.TemporaryDirectory() as work_dir:
+            output_path = os.path.join(work_dir, 'Result.csv')
+            for mode in modes:
+                if mode == 'incremental':
+                    # full runs remove the manifest, so an untimed incremental run writes the output
+                    # and manifest the timed no change run starts from
+                    run_child('seed_incremental', directory, archive_path, output_path, workers)
+                result = run_child(mode, directory, archive_path, output_path, workers)
+                result.update({'matches': n, 'mode': mode, 'files': 2 * n})
+                results.append(result)
+                print(format_result(result), flush=True)
+
+    return results
+
+
+def run_child(mode, directory, archive_path, output_path, workers):
+    '''
+    run_mode in a new python process
+    :return: result dictionary of run_mode
+    '''
+    command = [sys.executable, os.path.abspath(__file__), '--child', mode, directory, archive_path,
+               output_path, str(workers)]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    # the result is the last line the child prints
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def format_result(result):
+    '''
+    one line of the results table
+    '''
+    workers = result['peak_worker_memory_mb']
+    return (f"{result['matches']:>8} {result['mode']:<12} {result['wall_seconds']:>10.2f} "
+            f"{result['files_per_second']:>10.1f} {result['peak_memory_mb']:>10} "
+            f"{workers if workers is not None else '':>10}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        mode, directory, archive_path, output_path, workers = sys.argv[2:7]
+        print(json.dumps(run_mode(mode, directory, archive_path, output_path, int(workers))))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description='Benchmark the ingest modes on synthetic cricsheet data')
+    parser.add_argument('--matches', type=int, nargs='+', default=DEFAULT_MATCHES,
+                        help='data set sizes in matches (default: 1000 10000 100000)')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES,
+                        help='ingest modes to run (default: all)')
+    parser.add_argument('--data-dir', default=None,
+                        help='directory the synthetic data sets are kept in (default: <tmp>/cricsheet_benchmark)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes of the workers mode (default: number of cpus)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic data (default: 0)')
+    parser.add_argument('--output', default=None, help='json file to write the results to')
+    args = parser.parse_args()
+
+    print(f"{'matches':>8} {'mode':<12} {'wall s':>10} {'files/s':>10} {'peak MB':>10} {'worker MB':>10}")
+    results = benchmark(args.matches, args.modes, args.data_dir, args.workers, args.seed)
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump({'python': platform.python_version(), 'platform': platform.platform(),
+                       'cpus': os.cpu_count(), 'seed': args.seed, 'results': results}, f, indent=1)
@@ -0,0 +1,201 @@
+import csv
+import difflib
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# persisted alias table with the kinds
+#   venue       venue name (after the comma suffix is removed) -> canonical venue, canonical names map to themselves
+#   city        city name -> canonical city
+#   venue_city  canonical venue -> its city, replaces the missing or ambiguous city of the info file,
+#               the manually cleaned result_post_step.csv also has venue names which are not canonical
+#               (Sylhet Stadium), they are listed as well so venue_cities finds their city
+ALIAS_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'venue_aliases.csv')
+
+# kinds of the alias table
+ALIAS_KINDS = ['venue', 'city', 'venue_city']
+
+
+@lru_cache(maxsize=4)
+def _load_aliases(path, mtime):
+    # the table is only read again when it is changed
+    aliases = {kind: {} for kind in ALIAS_KINDS}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            aliases[row['kind']][row['name']] = row['canonical']
+    return aliases
+
+
+def load_aliases(path=ALIAS_TABLE_PATH):
+    '''
+    load the alias table
+    :param path: path of the alias table csv file
+    :return: dictionary of kind -> {name: canonical name}
+    '''
+    assert isinstance(path, str)
+
+    return _load_aliases(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+
+def strip_suffix(venue):
+    '''
+    remove the city cricsheet adds to some venue names after a comma,
+    eg. "Eden Gardens, Kolkata" -> "Eden Gardens"
+    :param venue: venue name
+    :return: venue name without the suffix
+    '''
+    return venue.split(',')[0].strip()
+
+
+def canonical_venue(venue, aliases):
+    '''
+    canonical name of a single venue
+    :param venue: venue name as in the raw data
+    :param aliases: alias table from load_aliases
+    :return: canonical venue name, unknown venues keep their name
+    '''
+    if not isinstance(venue, str):
+        return ''
+    venue = strip_suffix(venue)
+    return aliases['venue'].get(venue, venue)
+
+
+def canonical_city(venue, city, aliases):
+    '''
+    canonical city of a single venue
+    :param venue: canonical venue name
+    :param city: city name as in the raw data
+    :param aliases: alias table from load_aliases
+    :return: canonical city name, '' when it is unknown
+    '''
+    if venue in aliases['venue_city']:
+        return aliases['venue_city'][venue]
+    if not isinstance(city, str):
+        return ''
+    city = city.strip()
+    return aliases['city'].get(city, city)
+
+
+def map_unique(columns, function):
+    '''
+    apply a function to the rows of one or more columns through their dictionary codes, the
+    function is called once per distinct combination of values and the results are gathered
+    for all rows at once
+    :param columns: list of columns ; pandas Series
+    :param function: function taking one value of each column, missing values are passed as None
+    :return: numpy object array of the mapped values
+    '''
+    codes = []
+    uniques = []
+    for values in columns:
+        column_codes, column_uniques = pd.factorize(values)
+        # missing values have code -1, they get the code after the last value
+        codes.append(np.where(column_codes < 0, len(column_uniques), column_codes))
+        uniques.append(list(column_uniques) + [None])
+
+    # one code per combination of values
+    shape = [len(values) for values in uniques]
+    keys, inverse = np.unique(np.ravel_multi_index(codes, shape), return_inverse=True)
+    mapped = np.array([function(*[values[i] for values, i in zip(uniques, index)])
+                       for index in zip(*np.unravel_index(keys, shape))] + [None], dtype=object)[:-1]
+    return mapped[inverse]
+
+
+def canonicalize(frame, aliases=None):
+    '''
+    Add the canonical updated_venue and update_city columns to the processed data, existing
+    columns are replaced
+    :param frame: processed data with venue and city columns ; pandas Dataframe
+    :param aliases: alias table from load_aliases, default is the table of this directory
+    :return: pandas Dataframe
+    '''
+    assert isinstance(frame, pd.DataFrame)
+    if aliases is None:
+        aliases = load_aliases()
+
+    frame['updated_venue'] = map_unique([frame['venue']], lambda venue: canonical_venue(venue, aliases))
+    # the city depends on the venue as well, so the (venue, city) pairs are coded together
+    frame['update_city'] = map_unique([frame['updated_venue'], frame['city']],
+                                      lambda venue, city: canonical_city(venue, city, aliases))
+    return frame
+
+
+def canonicalize_record(record, aliases=None):
+    '''
+    add the canonical updated_venue and update_city fields to a single innings record
+    :param record: innings record dictionary with venue and city fields
+    :param aliases: alias table from load_aliases, default is the table of this directory
+    :return: the record
+    '''
+    if aliases is None:
+        aliases = load_aliases()
+
+    record['updated_venue'] = canonical_venue(record['venue'], aliases)
+    record['update_city'] = canonical_city(record['updated_venue'], record['city'], aliases)
+    return record
+
+
+def venue_cities(venues, cities, aliases=None):
+    '''
+    replace the cities of the venues listed in the venue_city table
+    :param venues: venue column, canonical or of result_post_step.csv ; pandas Series
+    :param cities: city column ; pandas Series
+    :param aliases: alias table from load_aliases, default is the table of this directory
+    :return: pandas Series of cities
+    '''
+    if aliases is None:
+        aliases = load_aliases()
+
+    table_cities = venues.astype(object).map(aliases['venue_city'])
+    return table_cities.where(table_cities.notna(), cities.astype(object))
+
+
+@lru_cache(maxsize=None)
+def _suggestions(name, known):
+    return difflib.get_close_matches(name, known, n=3, cutoff=0.6)
+
+
+def unknown_venues(venues, aliases=None, cache_path=None):
+    '''
+    find venues which are not in the alias table together with the known venues they most
+    likely are, the suggestions are cached in memory and in cache_path
+    :param venues: venue column (after the comma suffix is removed) ; pandas Series
+    :param aliases: alias table from load_aliases, default is the table of this directory
+    :param cache_path: json file keeping the suggestions between runs
+    :return: dictionary of unknown venue -> list of suggested canonical venues
+    '''
+    if aliases is None:
+        aliases = load_aliases()
+
+    names = set(venues.dropna().astype(str).unique())
+    unknown = sorted(name for name in names if name and name not in aliases['venue'])
+    if not unknown:
+        return {}
+
+    # the cached suggestions are only valid for the same set of known venues
+    known = tuple(sorted(aliases['venue']))
+    key = hashlib.sha1('\n'.join(known).encode('utf-8')).hexdigest()
+    cache = {}
+    if cache_path is not None and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+        if cache.get('known') != key:
+            cache = {}
+    suggestions = cache.setdefault('suggestions', {})
+
+    result = {}
+    for name in unknown:
+        if name not in suggestions:
+            suggestions[name] = [aliases['venue'][match] for match in _suggestions(name, known)]
+        result[name] = suggestions[name]
+
+    if cache_path is not None:
+        cache['known'] = key
+        with open(cache_path, 'w') as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+    return result
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from over_cube import OverCube
+from player_stats import PlayerStats
+
+
+# matches processed between two checkpoints
+CHECKPOINT_MATCHES = 500
+
+
+def checkpoint_path(output_path):
+    '''
+    location of the checkpoint directory belonging to a processed database
+    :param output_path: local path to database storage location
+    :return: path of the checkpoint directory
+    '''
+    return output_path + '.checkpoint'
+
+
+def run_key(input_directory_path, files, incremental):
+    '''
+    identify a run, a checkpoint is only resumed by a run processing the same files
+    :param input_directory_path: local path to data directory or archive
+    :param files: <id>.csv file names the run processes
+    :param incremental: True for an incremental run
+    :return: dictionary of json values
+    '''
+    digest = hashlib.sha1('\n'.join(files).encode('utf-8')).hexdigest()
+    return {'input': os.path.abspath(input_directory_path), 'files': digest, 'incremental': incremental}
+
+
+class Checkpoint:
+    '''
+    Durable batches of processed matches. Each batch holds the innings records, per over totals and
+    player lines of the matches processed since the previous batch, the state file lists the batches
+    and the files they cover and is only replaced once its batch is written, so a run which dies
+    leaves the last complete state behind
+    '''
+
+    def __init__(self, path, key):
+        '''
+        :param path: checkpoint directory, see checkpoint_path
+        :param key: run_key of the run
+        '''
+        self.path = path
+        self.key = key
+        self.state = {'key': key, 'batches': [], 'done': [], 'failed': [], 'next_index': None}
+        # innings and player lines of the collectors of this run already written to a batch
+        self._offsets = [0, 0, 0]
+        # files covered and failed by the batches of earlier runs
+        self._done_before = []
+        self._failed_before = []
+
+    def _state_path(self):
+        return os.path.join(self.path, 'checkpoint.json')
+
+    def resume(self):
+        '''
+        load the state of an earlier run of the same files
+        :return: True if there was such a state, otherwise the checkpoint starts empty
+        '''
+        if not os.path.exists(self._state_path()):
+            return False
+        with open(self._state_path()) as f:
+            state = json.load(f)
+        if state.get('key') != self.key:
+            print('Checkpoint belongs to a different run, starting again')
+            return False
+        self.state = state
+        self.state.setdefault('failed', [])
+        self._done_before = state['done']
+        self._failed_before = state['failed']
+        return True
+
+    @property
+    def done(self):
+        '''
+        set of the <id>.csv names of the files covered by the batches
+        '''
+        return set(self.state['done'])
+
+    @property
+    def failed(self):
+        '''
+        set of the <id>.csv names of the failed matches of the batches
+        '''
+        return set(self.state['failed'])
+
+    @property
+    def next_index(self):
+        '''
+        index label of the next innings record, None if no batch was written
+        '''
+        return self.state['next_index']
+
+    def commit(self, records, overs, players, done, next_index, failed=()):
+        '''
+        write a batch and the state covering it
+        :param records: innings records of the batch ; pandas DataFrame
+        :param overs: OverCube collecting the innings of this run, the innings added since the
+        previous commit are written
+        :param players: PlayerStats collecting the player lines of this run, the lines added since
+        the previous commit are written
+        :param done: <id>.csv names of the files processed by this run, including skipped and
+        failed matches
+        :param next_index: index label of the next innings record
+        :param failed: <id>.csv names of the failed matches of this run
+        :return:
+        '''
+        os.makedirs(self.path, exist_ok=True)
+        name = f"batch_{len(self.state['batches']):05d}.pkl"
+        innings, batting, bowling = self._offsets
+        batch = {'records': records, 'match_id': overs.match_ids[innings:],
+                 'innings_number': overs.innings_numbers[innings:], 'overs': overs.data[innings:],
+                 'batting': players.batting().iloc[batting:], 'bowling': players.bowling().iloc[bowling:]}
+        self._offsets = [len(overs), batting + len(batch['batting']), bowling + len(batch['bowling'])]
+        tmp_path = os.path.join(self.path, name + '.tmp')
+        pd.to_pickle(batch, tmp_path)
+        os.replace(tmp_path, os.path.join(self.path, name))
+
+        self.state['batches'].append(name)
+        self.state['done'] = self._done_before + list(done)
+        self.state['failed'] = self._failed_before + list(failed)
+        self.state['next_index'] = next_index
+        tmp_path = self._state_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self._state_path())
+
+    def load(self):
+        '''
+        read the batches of the state
+        :return: (list of innings record DataFrames, OverCube, PlayerStats) of all batches
+        '''
+        frames = []
+        overs = OverCube()
+        batting = []
+        bowling = []
+        for name in self.state['batches']:
+            batch = pd.read_pickle(os.path.join(self.path, name))
+            frames.append(batch['records'])
+            overs = overs.concat(OverCube(batch['match_id'], batch['innings_number'], batch['overs']))
+            batting.append(batch['batting'])
+            bowling.append(batch['bowling'])
+        players = PlayerStats(pd.concat(batting, ignore_index=True) if batting else None,
+                              pd.concat(bowling, ignore_index=True) if bowling else None)
+        return frames, overs, players
+
+    def clear(self):
+        '''
+        remove the checkpoint once the run is complete or started again
+        :return:
+        '''
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.state = {'key': self.key, 'batches': [], 'done': [], 'failed': [], 'next_index': None}
+        self._offsets = [0, 0, 0]
+        self._done_before = []
+        self._failed_before = []
@@ -0,0 +1,136 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # pyarrow is only needed for the columnar store
+    pa = None
+    ds = None
+
+from schema import INNINGS_SCHEMA, apply_schema, source_columns
+
+
+# the rows of the store are sorted by year and event, so the statistics of its row groups let
+# year and event filters skip the groups outside of them
+SORT_COLUMNS = ['year', 'event']
+
+# rows of a row group, small enough for a year filter to skip most of the groups of the few
+# thousand innings of the database, large enough to keep the per group overhead low
+ROW_GROUP_ROWS = 512
+
+# directory of the store in DataProcessing read by the visualizations (DataVisualization/load_data.py),
+# written by pre_process_data.py --store and by this script
+STORE_NAME = 'result_post_step_store'
+
+
+def _require_pyarrow():
+    '''
+    raise a readable error when pyarrow is not installed
+    '''
+    if pa is None:
+        raise ImportError('pyarrow is required for the columnar store, install it with pip install pyarrow')
+
+
+def arrow_type(column):
+    '''
+    arrow type of a column of the processed data, following the compact INNINGS_SCHEMA
+    :param column: column name
+    :return: pyarrow DataType
+    '''
+    dtype = INNINGS_SCHEMA.get(column, 'object')
+    if dtype == 'object':
+        return pa.string()
+    if dtype == 'category':
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.from_numpy_dtype(np.dtype(dtype))
+
+
+def store_schema(columns):
+    '''
+    explicit arrow schema of the store for the given columns
+    :param columns: column names of the processed data
+    :return: pyarrow Schema
+    '''
+    _require_pyarrow()
+
+    return pa.schema([(column, arrow_type(column)) for column in columns])
+
+
+def write_store(frame, store_path):
+    '''
+    write the processed data into a parquet store, a single file sorted by year and event in
+    row groups of ROW_GROUP_ROWS rows, an existing store at store_path is replaced
+    :param frame: processed data ; pandas Dataframe, converted to the compact schema
+    :param store_path: directory of the store
+    :return:
+    '''
+    _require_pyarrow()
+    assert isinstance(frame, pd.DataFrame)
+    assert isinstance(store_path, str)
+
+    frame = apply_schema(frame)
+    # the events are sorted by name, not by their category codes
+    frame = frame.sort_values(SORT_COLUMNS, key=lambda column: column.astype(object) if column.name == 'event'
+                              else column, kind='stable', ignore_index=True)
+
+    table = pa.Table.from_pandas(frame, schema=store_schema(frame.columns), preserve_index=False)
+
+    # write the store next to the old one and swap it in when complete
+    tmp_path = store_path + '.tmp'
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    ds.write_dataset(table, tmp_path, format='parquet', basename_template='part-{i}.parquet',
+                     min_rows_per_group=ROW_GROUP_ROWS, max_rows_per_group=ROW_GROUP_ROWS)
+    if os.path.exists(store_path):
+        shutil.rmtree(store_path)
+    os.rename(tmp_path, store_path)
+
+
+def load_store(store_path, columns=None, min_year=None, max_year=None, events=None):
+    '''
+    load the processed data from the parquet store, only the requested columns are read and
+    row groups outside of the requested years and events are skipped
+    :param store_path: directory of the store
+    :param columns: list of columns to load, None loads all columns
+    :param min_year: first year to load
+    :param max_year: last year to load
+    :param events: list of events to load
+    :return: pandas Dataframe in the compact schema
+    '''
+    _require_pyarrow()
+    assert isinstance(store_path, str)
+
+    # stores written before the single file layout are partitioned by year=/event= directories
+    dataset = ds.dataset(store_path, format='parquet', partitioning='hive')
+
+    # the filters skip the row groups whose year and event statistics are outside of them
+    condition = None
+    filters = []
+    if min_year is not None:
+        filters.append(ds.field('year') >= min_year)
+    if max_year is not None:
+        filters.append(ds.field('year') <= max_year)
+    if events is not None:
+        filters.append(ds.field('event').isin(list(events)))
+    for f in filters:
+        condition = f if condition is None else condition & f
+
+    # derived columns missing from stores written before they were added are computed from their sources
+    read = source_columns(columns, dataset.schema.names) if columns is not None else None
+    table = dataset.to_table(columns=read, filter=condition)
+    # the dictionaries of the files are unified again
+    frame = apply_schema(table.to_pandas())
+    return frame[list(columns)] if columns is not None else frame
+
+
+if __name__ == '__main__':
+    # create the store from the manually cleaned database used by the visualizations
+    BASE_PATH = os.getcwd()
+    DATABASE_PATH = os.path.join(BASE_PATH, "DataProcessing", "result_post_step.csv")
+    STORE_PATH = os.path.join(BASE_PATH, "DataProcessing", STORE_NAME)
+
+    write_store(pd.read_csv(DATABASE_PATH, keep_default_na=False), STORE_PATH)
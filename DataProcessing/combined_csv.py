@@ -0,0 +1,117 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from player_stats import player_lines
+from pre_process_data import MATCH_CSV_COLUMNS, finish_innings, innings_overs, match_fields, write_innings_csv
+
+
+# rows of the combined file read at a time
+CHUNK_ROWS = 100000
+
+
+def _match_rows(chunk, start, end, seen):
+    '''
+    rows of a single match of a chunk, indexed from 0 like a match read from its own file
+    '''
+    dataframe = chunk.iloc[start:end].reset_index(drop=True)
+    match_id = dataframe['match_id'].iat[0]
+    if match_id in seen:
+        raise ValueError(f'The rows of match {match_id} are not consecutive')
+    seen.add(match_id)
+    return dataframe
+
+
+def iter_combined_matches(path, chunk_rows=CHUNK_ROWS):
+    '''
+    Generator over the matches of cricsheet's combined ball by ball csv file of all matches
+    (all_matches.csv). The file is read in chunks of chunk_rows rows and the rows of the last match
+    of a chunk are carried over to the next chunk, so only a chunk and a match are held in memory
+    however large the file is
+    :param path: path of the combined csv file, compressed files (.zip, .gz, ...) are read as well
+    :param chunk_rows: number of rows read at a time
+    :return: yields the ball by ball data of one match at a time ; pandas DataFrame with the MATCH_CSV_COLUMNS
+    '''
+    assert isinstance(chunk_rows, int) and chunk_rows >= 1
+
+    # the rows of the match which continues in the next chunk, split into the chunks they were read in
+    carry = []
+    # match ids already yielded, the rows of a match have to be consecutive
+    seen = set()
+    for chunk in pd.read_csv(path, usecols=MATCH_CSV_COLUMNS, chunksize=chunk_rows):
+        match_ids = chunk['match_id'].to_numpy()
+        if carry and (match_ids == carry[0]['match_id'].iat[0]).all():
+            # the whole chunk continues the carried match
+            carry.append(chunk)
+            continue
+        if carry:
+            chunk = pd.concat(carry + [chunk], ignore_index=True)
+            match_ids = chunk['match_id'].to_numpy()
+        # a match starts where the match id changes
+        bounds = [0] + (np.flatnonzero(match_ids[1:] != match_ids[:-1]) + 1).tolist()
+
+        # the last match of the chunk may continue in the next one
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            yield _match_rows(chunk, start, end, seen)
+        carry = [chunk.iloc[bounds[-1]:].copy()]
+
+    if carry:
+        chunk = pd.concat(carry, ignore_index=True)
+        yield _match_rows(chunk, 0, len(chunk), seen)
+
+
+def iter_combined_fields(path, chunk_rows=CHUNK_ROWS, overs=None, players=None):
+    '''
+    Generator over the innings data of the matches of the combined csv file, matches which can
+    not be processed are reported and skipped
+    :param path: path of the combined csv file
+    :param chunk_rows: number of rows read at a time
+    :param overs: OverCube collecting the per over totals of the yielded matches
+    :param players: PlayerStats collecting the batting and bowling lines of the yielded matches
+    :return: yields (first inning, second inning) dictionaries like id_csv
+    '''
+    for dataframe in iter_combined_matches(path, chunk_rows):
+        try:
+            match_overs = innings_overs(dataframe)
+            fields = match_fields(dataframe, match_overs)
+            lines = player_lines(dataframe) if players is not None else None
+        except Exception as e:
+            print(e)
+            print(f"Error Occurred with match {dataframe['match_id'].iat[0]} of {path}")
+            continue
+
+        match_id = int(dataframe['match_id'].iat[0])
+        if overs is not None:
+            overs.append(match_id, match_overs)
+        if players is not None:
+            players.append(match_id, lines)
+        yield fields
+
+
+def iter_combined_innings(path, chunk_rows=CHUNK_ROWS, overs=None, players=None):
+    '''
+    Generator over the innings records of the combined csv file, one record at a time
+    :param path: path of the combined csv file
+    :param chunk_rows: number of rows read at a time
+    :param overs: OverCube collecting the per over totals of the yielded matches
+    :param players: PlayerStats collecting the batting and bowling lines of the yielded matches
+    :return: yields innings record dictionaries, first inning followed by second inning of each match
+    '''
+    for fieldA, fieldB in iter_combined_fields(path, chunk_rows, overs, players):
+        yield finish_innings(fieldA)
+        yield finish_innings(fieldB)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Process cricsheet's combined csv file of all matches in chunks")
+    parser.add_argument('input', help='path of the combined csv file, eg. all_matches.csv')
+    parser.add_argument('--output', default=os.path.join(os.getcwd(), 'DataProcessing', 'Result_combined.csv'),
+                        help='csv file to write the innings records to (default: DataProcessing/Result_combined.csv)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help=f'rows read at a time (default: {CHUNK_ROWS})')
+    args = parser.parse_args()
+
+    # the records are written as they are processed so the memory does not grow with the file
+    print(write_innings_csv(iter_combined_innings(args.input, args.chunk_rows), args.output))
@@ -0,0 +1,131 @@
+import csv
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+
+# keys needed to build the processed innings records
+REQUIRED_KEYS = ['toss_winner', 'toss_decision', 'city', 'winner', 'event']
+
+# lines with these keys follow all of the single valued match information
+PEOPLE_KEYS = ['player', 'players', 'registry']
+
+
+@dataclass
+class MatchInfo:
+    '''
+    Typed record of the match information stored in a cricsheet <id>_info.csv file
+    '''
+    version: Optional[str] = None
+    balls_per_over: Optional[int] = None
+    teams: List[str] = field(default_factory=list)
+    gender: Optional[str] = None
+    season: Optional[str] = None
+    dates: List[date] = field(default_factory=list)
+    event: Optional[str] = None
+    match_number: Optional[int] = None
+    venue: Optional[str] = None
+    city: Optional[str] = None
+    toss_winner: Optional[str] = None
+    toss_decision: Optional[str] = None
+    player_of_match: List[str] = field(default_factory=list)
+    umpires: List[str] = field(default_factory=list)
+    reserve_umpire: Optional[str] = None
+    tv_umpire: Optional[str] = None
+    match_referee: Optional[str] = None
+    winner: Optional[str] = None
+    winner_runs: Optional[int] = None
+    winner_wickets: Optional[int] = None
+    outcome: Optional[str] = None
+    method: Optional[str] = None
+    eliminator: Optional[str] = None
+    # team -> list of players
+    players: Dict[str, List[str]] = field(default_factory=dict)
+    # player name -> cricsheet person identifier
+    registry: Dict[str, str] = field(default_factory=dict)
+    # any other key -> list of values
+    other: Dict[str, List[str]] = field(default_factory=dict)
+
+
+# conversion of the single valued keys
+_INT_KEYS = ['balls_per_over', 'match_number', 'winner_runs', 'winner_wickets']
+_STR_KEYS = ['gender', 'season', 'event', 'venue', 'city', 'toss_winner', 'toss_decision',
+             'reserve_umpire', 'tv_umpire', 'match_referee', 'winner', 'outcome', 'method',
+             'eliminator']
+
+
+def _add_value(info, key, values):
+    '''
+    store the values of a single info line in the match information record
+    :param info: MatchInfo record
+    :param key: info key of the line
+    :param values: remaining fields of the line
+    :return:
+    '''
+    value = values[0] if values else ''
+
+    if key in _STR_KEYS:
+        setattr(info, key, value)
+    elif key in _INT_KEYS:
+        setattr(info, key, int(value) if value.isdigit() else None)
+    elif key == 'team':
+        info.teams.append(value)
+    elif key == 'date':
+        info.dates.append(datetime.strptime(value, '%Y/%m/%d').date())
+    elif key == 'player_of_match':
+        info.player_of_match.append(value)
+    elif key == 'umpire':
+        info.umpires.append(value)
+    elif key in ['player', 'players']:
+        info.players.setdefault(value, []).append(values[1])
+    elif key == 'registry':
+        # registry,people,<name>,<identifier>
+        info.registry[values[1]] = values[2]
+    else:
+        info.other.setdefault(key, []).append(value)
+
+
+def parse_info(lines, required=None):
+    '''
+    Parse the lines of a cricsheet info file into a MatchInfo record
+    :param lines: iterable of text lines of the info file
+    :param required: list of keys, if given parsing stops as soon as these keys are found
+    (or the match has no result) and the players and registry are not read
+    :return: MatchInfo record
+    '''
+    info = MatchInfo()
+    missing = set(required) if required is not None else None
+
+    for row in csv.reader(lines):
+        if not row:
+            continue
+        if row[0] == 'version':
+            info.version = row[1]
+            continue
+
+        key = row[1]
+        if missing is not None:
+            # single valued information is finished once the people are listed
+            if key in PEOPLE_KEYS:
+                break
+            missing.discard(key)
+
+        _add_value(info, key, row[2:])
+
+        if missing is not None and (not missing or key == 'outcome'):
+            break
+
+    return info
+
+
+def read_info(path, required=None):
+    '''
+    Read a cricsheet <id>_info.csv file into a MatchInfo record
+    :param path: should be valid path to file
+    :param required: list of keys, if given reading stops as soon as these keys are found
+    :return: MatchInfo record
+    '''
+    assert isinstance(path, str)
+
+    with open(path, newline='', encoding='utf-8') as f:
+        return parse_info(f, required)
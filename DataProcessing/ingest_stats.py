@@ -0,0 +1,152 @@
+import heapq
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None
+
+
+# stages of processing a match, in order
+STAGES = ['read', 'parse', 'aggregate', 'merge']
+
+
+def peak_memory_mb():
+    '''
+    peak resident memory of this process and its finished worker processes
+    :return: (own peak, worker peak) in MB, None when it can not be measured
+    '''
+    if resource is None:
+        return None, None
+
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    scale = 1 / (1 << 20) if sys.platform == 'darwin' else 1 / (1 << 10)
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return round(own, 1), round(children, 1)
+
+
+class IngestStats:
+    '''
+    Collects the stage timings, throughput, slowest files, skipped matches and
+    failures of an ingest run
+    '''
+
+    def __init__(self, slowest=10):
+        '''
+        :param slowest: number of slowest files to keep
+        '''
+        assert isinstance(slowest, int) and slowest >= 0
+
+        self.slowest_n = slowest
+        self.stage_seconds = {stage: 0.0 for stage in STAGES}
+        self.matches = 0
+        self.files = 0
+        self.rows = 0
+        self.innings = 0
+        self.skipped = []
+        self.failures = []
+        self.unknown_venues = {}
+        # min heap of (seconds, file) holding the slowest files
+        self._slowest = []
+        self._start = time.perf_counter()
+
+    def add_time(self, stage, seconds):
+        '''
+        add time spent in a stage
+        :param stage: one of STAGES
+        :param seconds: time spent
+        :return:
+        '''
+        self.stage_seconds[stage] += seconds
+
+    @contextmanager
+    def timer(self, stage):
+        '''
+        time the body of a with statement as part of a stage
+        :param stage: one of STAGES
+        '''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def add_match(self, report):
+        '''
+        add the report of a processed match
+        :param report: dictionary from process_match with file, status, timings and rows,
+        the reason of skipped matches and the stage and error of failed ones
+        :return:
+        '''
+        self.matches += 1
+        self.files += report.get('files', 2)
+        self.rows += report.get('rows', 0)
+
+        seconds = 0.0
+        for stage, stage_seconds in report['timings'].items():
+            self.add_time(stage, stage_seconds)
+            seconds += stage_seconds
+
+        if report['status'] == 'ok':
+            self.innings += 2
+        elif report['status'] == 'skipped':
+            self.skipped.append({'file': report['file'], 'reason': report['reason']})
+        else:
+            self.failures.append({'file': report['file'], 'stage': report['stage'],
+                                  'error': report['error']})
+
+        # keep the slowest files
+        entry = (seconds, report['file'])
+        if len(self._slowest) < self.slowest_n:
+            heapq.heappush(self._slowest, entry)
+        elif self._slowest and entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def add_unknown_venues(self, suggestions):
+        '''
+        add the venues which are not in the alias table
+        :param suggestions: dictionary of venue -> suggested canonical venues
+        :return:
+        '''
+        self.unknown_venues.update(suggestions)
+
+    def summary(self):
+        '''
+        summary of the run so far
+        :return: dictionary which can be written as json
+        '''
+        wall = time.perf_counter() - self._start
+        own, workers = peak_memory_mb()
+
+        return {
+            'wall_seconds': round(wall, 3),
+            'stage_seconds': {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()},
+            'matches': self.matches,
+            'files': self.files,
+            'rows': self.rows,
+            'innings': self.innings,
+            'files_per_second': round(self.files / wall, 1) if wall > 0 else None,
+            'rows_per_second': round(self.rows / wall, 1) if wall > 0 else None,
+            'peak_memory_mb': own,
+            'peak_worker_memory_mb': workers,
+            'slowest_files': [{'file': file, 'seconds': round(seconds, 4)}
+                              for seconds, file in sorted(self._slowest, reverse=True)],
+            'skipped': self.skipped,
+            'failures': self.failures,
+            'unknown_venues': self.unknown_venues,
+        }
+
+    def write_report(self, path):
+        '''
+        write the summary of the run to a json file
+        :param path: path of the report
+        :return: summary dictionary
+        '''
+        summary = self.summary()
+        with open(path, 'w') as f:
+            json.dump(summary, f, indent=1)
+        return summary
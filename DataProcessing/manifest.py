@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+
+from archive_reader import archive_index, is_archive
+
+
+def manifest_path(output_path):
+    '''
+    location of the manifest belonging to a processed database
+    :param output_path: local path to database storage location
+    :return: path of the manifest file
+    '''
+    return output_path + '.manifest.json'
+
+
+def load_manifest(path):
+    '''
+    load the manifest of already ingested matches
+    :param path: path of the manifest file
+    :return: dictionary of match id -> file signatures, empty if there is no manifest yet
+    '''
+    assert isinstance(path, str)
+
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    '''
+    write the manifest of ingested matches, the file is replaced atomically
+    :param manifest: dictionary of match id -> file signatures
+    :param path: path of the manifest file
+    :return:
+    '''
+    assert isinstance(manifest, dict)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def file_hash(path):
+    '''
+    content hash of a file
+    :param path: should be valid path to file
+    :return: hex digest of the file content
+    '''
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_signature(path, previous=None):
+    '''
+    size, modification time and content hash of a file
+    :param path: path to file
+    :param previous: earlier signature of the file, its hash is reused when size and mtime did not change
+    :return: dictionary with size, mtime and sha1, None if the file does not exist
+    '''
+    if not os.path.exists(path):
+        # the match is processed and fails like a pair with a missing archive member
+        return None
+    stat = os.stat(path)
+    signature = {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+    if previous is not None and 'sha1' in previous and previous.get('size') == signature['size'] \
+            and previous.get('mtime') == signature['mtime']:
+        signature['sha1'] = previous['sha1']
+    else:
+        signature['sha1'] = file_hash(path)
+    return signature
+
+
+def match_signature(input_directory_path, file, previous=None):
+    '''
+    signatures of the <id>.csv and <id>_info.csv pair of a match
+    :param input_directory_path: local path to data directory
+    :param file: file name of the <id>.csv ball by ball file
+    :param previous: earlier signature of the match
+    :return: dictionary with the csv and info file signatures, None for a missing file
+    '''
+    if previous is None:
+        previous = {}
+    info_file = f"{file[:-4]}_info.csv"
+
+    return {'csv': file_signature(os.path.join(input_directory_path, file), previous.get('csv')),
+            'info': file_signature(os.path.join(input_directory_path, info_file), previous.get('info'))}
+
+
+def archive_match_signature(index, file):
+    '''
+    signatures of the <id>.csv and <id>_info.csv members of a match in an archive, taken from
+    the archive headers so nothing is extracted
+    :param index: archive_index() of the archive
+    :param file: member name of the <id>.csv ball by ball file
+    :return: dictionary with the csv and info member signatures, None for a missing member
+    '''
+    return {'csv': index.get(file), 'info': index.get(f"{file[:-4]}_info.csv")}
+
+
+def _content(signature):
+    '''
+    the part of a file signature which identifies the content: the sha1 of files in a directory,
+    the size and crc32 of zip members and the size and mtime of tar members
+    '''
+    if signature is None:
+        return None
+    if 'sha1' in signature:
+        return signature['sha1']
+    if 'crc' in signature:
+        return signature['size'], signature['crc']
+    return signature['size'], signature['mtime']
+
+
+def changed_matches(input_directory_path, files, manifest):
+    '''
+    find the matches which are new or changed since the manifest was written
+    :param input_directory_path: local path to data directory or zip/tar archive
+    :param files: file names of the <id>.csv ball by ball files in the directory
+    :param manifest: dictionary of match id -> file signatures
+    :return: (changed files, removed match ids, signatures of all files)
+    '''
+    assert isinstance(manifest, dict)
+
+    index = archive_index(input_directory_path) if is_archive(input_directory_path) else None
+
+    changed = []
+    signatures = {}
+    for file in files:
+        match_id = file[:-4]
+        previous = manifest.get(match_id)
+        if index is None:
+            signature = match_signature(input_directory_path, file, previous)
+        else:
+            signature = archive_match_signature(index, file)
+        signatures[match_id] = signature
+
+        # only the content decides if a match has to be processed again
+        if previous is None or _content(previous['csv']) != _content(signature['csv']) \
+                or _content(previous['info']) != _content(signature['info']):
+            changed.append(file)
+
+    removed = [match_id for match_id in manifest if match_id not in signatures]
+
+    return changed, removed, signatures
@@ -0,0 +1,177 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# overs of an inning, balls bowled after the 20th over (only in faulty data) count to the last over
+OVERS = 20
+
+# totals kept for every over
+MEASURES = ['runs', 'extras', 'wickets', 'legal_balls']
+
+
+def over_totals(innings, over, runs, extras, wickets, legal_balls):
+    '''
+    totals of every over of both innings of a match in a single grouped reduction
+    :param innings: inning of each ball, balls of other innings than 1 and 2 (super overs) are ignored
+    :param over: over of each ball starting at 0
+    :param runs: runs scored from each ball including extras
+    :param extras: extras of each ball
+    :param wickets: 1 if a wicket fell on the ball
+    :param legal_balls: 1 if the ball was not a wide or no ball
+    :return: int64 numpy array of shape (2 innings, OVERS, MEASURES)
+    '''
+    keep = (innings == 1) | (innings == 2)
+    key = (innings[keep] - 1) * OVERS + np.minimum(over[keep], OVERS - 1)
+
+    totals = np.empty((2 * OVERS, len(MEASURES)), dtype=np.int64)
+    for i, values in enumerate([runs, extras, wickets, legal_balls]):
+        totals[:, i] = np.bincount(key, weights=values[keep], minlength=2 * OVERS)
+    return totals.reshape(2, OVERS, len(MEASURES))
+
+
+def range_totals(overs, first_over, last_over):
+    '''
+    totals of a range of overs
+    :param overs: per over totals with the overs on axis -2, eg. from over_totals
+    :param first_over: first over of the range, counting from 1
+    :param last_over: last over of the range, counting from 1, included
+    :return: numpy array of the totals with the overs axis removed
+    '''
+    assert 1 <= first_over <= last_over <= OVERS
+
+    return overs[..., first_over - 1:last_over, :].sum(axis=-2)
+
+
+def over_cube_path(output_path):
+    '''
+    location of the per over cube belonging to a processed database
+    :param output_path: local path to database storage location
+    :return: path of the cube file
+    '''
+    return os.path.splitext(output_path)[0] + '_overs.npz'
+
+
+class OverCube:
+    '''
+    Per inning, per over totals of runs, extras, wickets and legal balls of every processed inning.
+    Totals of any range of overs are differences of the cumulative sums over the overs, so new phase
+    definitions do not need the raw data
+    '''
+
+    def __init__(self, match_ids=None, innings_numbers=None, data=None):
+        '''
+        :param match_ids: match id of each inning
+        :param innings_numbers: 1 or 2 for each inning
+        :param data: numpy array of shape (innings, OVERS, MEASURES)
+        '''
+        # innings collected with append, joined when the cube is used
+        self._match_ids = []
+        self._innings_numbers = []
+        self._chunks = []
+        if data is not None:
+            self._match_ids.append(np.asarray(match_ids, dtype=np.int64))
+            self._innings_numbers.append(np.asarray(innings_numbers, dtype=np.int8))
+            self._chunks.append(np.asarray(data))
+        self._cumulative = None
+
+    def append(self, match_id, overs):
+        '''
+        add both innings of a match
+        :param match_id: match id
+        :param overs: numpy array of shape (2, OVERS, MEASURES) from over_totals
+        :return:
+        '''
+        self._match_ids.append(np.array([match_id, match_id], dtype=np.int64))
+        self._innings_numbers.append(np.array([1, 2], dtype=np.int8))
+        self._chunks.append(overs)
+        self._cumulative = None
+
+    def _join(self):
+        # join the appended innings into single arrays
+        if len(self._chunks) != 1:
+            self._match_ids = [np.concatenate(self._match_ids) if self._match_ids else np.zeros(0, np.int64)]
+            self._innings_numbers = [np.concatenate(self._innings_numbers) if self._innings_numbers
+                                     else np.zeros(0, np.int8)]
+            self._chunks = [np.concatenate(self._chunks).astype(np.int16) if self._chunks
+                            else np.zeros((0, OVERS, len(MEASURES)), np.int16)]
+        return self._match_ids[0], self._innings_numbers[0], self._chunks[0]
+
+    @property
+    def match_ids(self):
+        return self._join()[0]
+
+    @property
+    def innings_numbers(self):
+        return self._join()[1]
+
+    @property
+    def data(self):
+        return self._join()[2]
+
+    def __len__(self):
+        return len(self.match_ids)
+
+    def drop(self, match_ids):
+        '''
+        cube without the innings of the given matches
+        :param match_ids: match ids to remove
+        :return: OverCube
+        '''
+        keep = ~np.isin(self.match_ids, np.asarray(match_ids, dtype=np.int64))
+        return OverCube(self.match_ids[keep], self.innings_numbers[keep], self.data[keep])
+
+    def concat(self, other):
+        '''
+        cube holding the innings of this cube followed by the innings of other
+        :param other: OverCube
+        :return: OverCube
+        '''
+        return OverCube(np.concatenate([self.match_ids, other.match_ids]),
+                        np.concatenate([self.innings_numbers, other.innings_numbers]),
+                        np.concatenate([self.data, other.data]))
+
+    def save(self, path):
+        '''
+        write the cube to a npz file, the file is replaced atomically
+        :param path: path of the cube file
+        :return:
+        '''
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, match_id=self.match_ids, innings_number=self.innings_numbers, overs=self.data)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        '''
+        read a cube written by save
+        :param path: path of the cube file
+        :return: OverCube
+        '''
+        with np.load(path) as f:
+            return cls(f['match_id'], f['innings_number'], f['overs'])
+
+    def phase_totals(self, phases):
+        '''
+        Totals of any phases of every inning from range sums over the cube
+        :param phases: dictionary of phase name -> (first over, last over), overs count from 1 and the last
+        over is included, eg. {'powerplay': (1, 6), 'last_3': (18, 20)}
+        :return: pandas DataFrame with match_id, innings_number and a <measure>_<phase> column for each
+        measure and phase
+        '''
+        assert isinstance(phases, dict)
+
+        if self._cumulative is None:
+            # cumulative totals with a leading 0 over so a range is a single difference
+            cumulative = np.zeros((len(self), OVERS + 1, len(MEASURES)), dtype=np.int32)
+            np.cumsum(self.data, axis=1, out=cumulative[:, 1:])
+            self._cumulative = cumulative
+
+        columns = {'match_id': self.match_ids, 'innings_number': self.innings_numbers}
+        for name, (first_over, last_over) in phases.items():
+            assert 1 <= first_over <= last_over <= OVERS
+            totals = self._cumulative[:, last_over] - self._cumulative[:, first_over - 1]
+            for i, measure in enumerate(MEASURES):
+                columns[f'{measure}_{name}'] = totals[:, i]
+        return pd.DataFrame(columns)
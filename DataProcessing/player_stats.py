@@ -0,0 +1,247 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# columns of the per match batting and bowling lines
+BATTING_COLUMNS = ['match_id', 'innings', 'team', 'player', 'runs', 'balls', 'fours', 'sixes', 'dismissal']
+BOWLING_COLUMNS = ['match_id', 'innings', 'team', 'player', 'legal_balls', 'runs_conceded', 'wickets', 'dots']
+
+# wicket types credited to the bowler
+BOWLER_WICKETS = ['bowled', 'caught', 'caught and bowled', 'lbw', 'stumped', 'hit wicket']
+
+# the batter left the field without being out
+NOT_OUT = ['not out', 'retired hurt', 'retired not out']
+
+
+def player_lines(dataf):
+    '''
+    Batting and bowling lines of every player in both innings of a match, super overs are ignored
+    :param dataf: ball by ball data of the match with the innings, batting_team, bowling_team, striker,
+    non_striker, bowler, runs_off_bat, wides, noballs, wicket_type and player_dismissed columns
+    :return: (batting, bowling) dictionaries of column -> list, with the BATTING_COLUMNS and
+    BOWLING_COLUMNS except match_id, the batters of an inning are in batting order
+    '''
+    batting = {column: [] for column in BATTING_COLUMNS[1:]}
+    bowling = {column: [] for column in BOWLING_COLUMNS[1:]}
+
+    runs_off_bat = dataf['runs_off_bat'].to_numpy()
+    wides = dataf['wides'].fillna(0).to_numpy()
+    noballs = dataf['noballs'].fillna(0).to_numpy()
+    legal = (wides == 0) & (noballs == 0)
+    # byes and leg byes are not charged to the bowler
+    conceded = runs_off_bat + wides + noballs
+    wicket_type = dataf['wicket_type'].to_numpy(dtype=object)
+    dismissed = dataf['player_dismissed'].to_numpy(dtype=object)
+    out = dataf['player_dismissed'].notna().to_numpy()
+    credited = dataf['wicket_type'].isin(BOWLER_WICKETS).to_numpy()
+    strikers = dataf['striker'].to_numpy(dtype=object)
+    non_strikers = dataf['non_striker'].to_numpy(dtype=object)
+    bowlers = dataf['bowler'].to_numpy(dtype=object)
+    innings = dataf['innings'].to_numpy()
+
+    for half_value in [1, 2]:
+        rows = np.flatnonzero(innings == half_value)
+        if len(rows) == 0:
+            continue
+        batting_team = dataf['batting_team'].iat[rows[0]]
+        bowling_team = dataf['bowling_team'].iat[rows[0]]
+
+        # batters in the order they appear, including non strikers who did not face a ball
+        out_rows = rows[out[rows]]
+        codes, batters = pd.factorize(np.concatenate([strikers[rows], non_strikers[rows], dismissed[out_rows]]))
+        striker = codes[:len(rows)]
+        n = len(batters)
+
+        dismissal = np.full(n, 'not out', dtype=object)
+        dismissal[codes[2 * len(rows):]] = wicket_type[out_rows]
+        balls_runs = runs_off_bat[rows]
+        batting['innings'] += [half_value] * n
+        batting['team'] += [batting_team] * n
+        batting['player'] += batters.tolist()
+        batting['runs'] += np.bincount(striker, weights=balls_runs, minlength=n).astype(np.int64).tolist()
+        # no balls are faced, wides are not
+        batting['balls'] += np.bincount(striker, weights=wides[rows] == 0, minlength=n).astype(np.int64).tolist()
+        batting['fours'] += np.bincount(striker, weights=balls_runs == 4, minlength=n).astype(np.int64).tolist()
+        batting['sixes'] += np.bincount(striker, weights=balls_runs == 6, minlength=n).astype(np.int64).tolist()
+        batting['dismissal'] += dismissal.tolist()
+
+        codes, innings_bowlers = pd.factorize(bowlers[rows])
+        n = len(innings_bowlers)
+        bowling['innings'] += [half_value] * n
+        bowling['team'] += [bowling_team] * n
+        bowling['player'] += innings_bowlers.tolist()
+        bowling['legal_balls'] += np.bincount(codes, weights=legal[rows], minlength=n).astype(np.int64).tolist()
+        bowling['runs_conceded'] += np.bincount(codes, weights=conceded[rows], minlength=n).astype(np.int64).tolist()
+        bowling['wickets'] += np.bincount(codes, weights=credited[rows], minlength=n).astype(np.int64).tolist()
+        bowling['dots'] += np.bincount(codes, weights=legal[rows] & (conceded[rows] == 0),
+                                       minlength=n).astype(np.int64).tolist()
+
+    return batting, bowling
+
+
+def player_paths(output_path):
+    '''
+    location of the player files belonging to a processed database
+    :param output_path: local path to database storage location
+    :return: dictionary of batting, bowling, batting_careers and bowling_careers -> path
+    '''
+    base = os.path.splitext(output_path)[0]
+    return {name: f'{base}_{name}.csv' for name in ['batting', 'bowling', 'batting_careers', 'bowling_careers']}
+
+
+def batting_careers(batting):
+    '''
+    career rollup of the batting lines
+    :param batting: batting lines ; pandas DataFrame with the BATTING_COLUMNS
+    :return: pandas DataFrame indexed by player
+    '''
+    lines = batting.assign(out=~batting['dismissal'].isin(NOT_OUT),
+                           fifties=(batting['runs'] >= 50) & (batting['runs'] < 100),
+                           hundreds=batting['runs'] >= 100)
+    careers = lines.groupby('player').agg(matches=('match_id', 'nunique'), innings=('match_id', 'size'),
+                                          outs=('out', 'sum'), runs=('runs', 'sum'), balls=('balls', 'sum'),
+                                          highest=('runs', 'max'), fours=('fours', 'sum'),
+                                          sixes=('sixes', 'sum'), fifties=('fifties', 'sum'),
+                                          hundreds=('hundreds', 'sum'))
+    careers['not_outs'] = careers['innings'] - careers['outs']
+    careers['average'] = (careers['runs'] / careers['outs'].where(careers['outs'] > 0)).round(2)
+    careers['strike_rate'] = (100 * careers['runs'] / careers['balls'].where(careers['balls'] > 0)).round(2)
+    return careers.drop(columns='outs')
+
+
+def bowling_careers(bowling):
+    '''
+    career rollup of the bowling lines
+    :param bowling: bowling lines ; pandas DataFrame with the BOWLING_COLUMNS
+    :return: pandas DataFrame indexed by player
+    '''
+    careers = bowling.groupby('player').agg(matches=('match_id', 'nunique'), innings=('match_id', 'size'),
+                                            balls=('legal_balls', 'sum'), runs=('runs_conceded', 'sum'),
+                                            wickets=('wickets', 'sum'), dots=('dots', 'sum'),
+                                            best_wickets=('wickets', 'max'))
+    wickets = careers['wickets'].where(careers['wickets'] > 0)
+    careers['economy'] = (6 * careers['runs'] / careers['balls'].where(careers['balls'] > 0)).round(2)
+    careers['average'] = (careers['runs'] / wickets).round(2)
+    careers['strike_rate'] = (careers['balls'] / wickets).round(2)
+    return careers
+
+
+class PlayerStats:
+    '''
+    Collects the per match batting and bowling lines while the matches are processed and
+    rolls them up into careers keyed by player
+    '''
+
+    def __init__(self, batting=None, bowling=None):
+        '''
+        :param batting: existing batting lines ; pandas DataFrame
+        :param bowling: existing bowling lines ; pandas DataFrame
+        '''
+        self._batting = {column: [] for column in BATTING_COLUMNS}
+        self._bowling = {column: [] for column in BOWLING_COLUMNS}
+        self._frames = [batting, bowling]
+
+    def append(self, match_id, lines):
+        '''
+        add the lines of a match
+        :param match_id: match id
+        :param lines: (batting, bowling) from player_lines
+        :return:
+        '''
+        for columns, match_lines in zip([self._batting, self._bowling], lines):
+            columns['match_id'] += [match_id] * len(match_lines['player'])
+            for column, values in match_lines.items():
+                columns[column] += values
+
+    def _frame(self, i, columns):
+        # lines appended since the existing frame was loaded, if any
+        if self._frames[i] is None:
+            return pd.DataFrame(columns)
+        if not columns['match_id']:
+            return self._frames[i].reset_index(drop=True)
+        return pd.concat([self._frames[i], pd.DataFrame(columns)], ignore_index=True)
+
+    def batting(self):
+        '''
+        :return: batting lines ; pandas DataFrame with the BATTING_COLUMNS
+        '''
+        return self._frame(0, self._batting)
+
+    def bowling(self):
+        '''
+        :return: bowling lines ; pandas DataFrame with the BOWLING_COLUMNS
+        '''
+        return self._frame(1, self._bowling)
+
+    def drop(self, match_ids):
+        '''
+        remove the lines of the given matches
+        :param match_ids: match ids to remove
+        :return:
+        '''
+        self._frames = [frame[~frame['match_id'].isin(match_ids)] if frame is not None else None
+                        for frame in [self.batting(), self.bowling()]]
+        self._batting = {column: [] for column in BATTING_COLUMNS}
+        self._bowling = {column: [] for column in BOWLING_COLUMNS}
+
+    def concat(self, other):
+        '''
+        player stats holding the lines of these stats followed by the lines of other
+        :param other: PlayerStats
+        :return: PlayerStats
+        '''
+        frames = []
+        for own, others in [(self.batting(), other.batting()), (self.bowling(), other.bowling())]:
+            # empty frames have no column types
+            lines = [frame for frame in [own, others] if len(frame)] or [own]
+            frames.append(pd.concat(lines, ignore_index=True))
+        return PlayerStats(*frames)
+
+    def save(self, output_path):
+        '''
+        write the lines and the career rollups next to the processed database
+        :param output_path: local path to database storage location
+        :return:
+        '''
+        paths = player_paths(output_path)
+        batting, bowling = self.batting(), self.bowling()
+        batting.to_csv(paths['batting'], index=False)
+        bowling.to_csv(paths['bowling'], index=False)
+        batting_careers(batting).to_csv(paths['batting_careers'])
+        bowling_careers(bowling).to_csv(paths['bowling_careers'])
+
+    @classmethod
+    def load(cls, output_path):
+        '''
+        read the lines written by save
+        :param output_path: local path to database storage location
+        :return: PlayerStats
+        '''
+        paths = player_paths(output_path)
+        return cls(pd.read_csv(paths['batting'], keep_default_na=False),
+                   pd.read_csv(paths['bowling'], keep_default_na=False))
+
+
+def load_careers(output_path):
+    '''
+    load the career rollups of a processed database
+    :param output_path: local path to database storage location
+    :return: (batting careers, bowling careers) ; pandas DataFrames indexed by player
+    '''
+    paths = player_paths(output_path)
+    return (pd.read_csv(paths['batting_careers'], index_col='player'),
+            pd.read_csv(paths['bowling_careers'], index_col='player'))
+
+
+def leaderboard(careers, stat, n=10, min_innings=1):
+    '''
+    players with the highest value of a career statistic
+    :param careers: batting or bowling careers
+    :param stat: column of the careers to rank by, eg. runs or wickets
+    :param n: number of players
+    :param min_innings: only rank players with at least this many innings
+    :return: pandas DataFrame
+    '''
+    return careers[careers['innings'] >= min_innings].nlargest(n, stat)
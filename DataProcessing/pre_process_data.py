@@ -1,60 +1,96 @@
 import pandas as pd
+import numpy as np
 import os
-
-
-def run_wickets(df, over):
+import argparse
+import csv
+import io
+import time
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
+
+from archive_reader import archive_index, is_archive, iter_match_pairs
+from canonical_names import canonicalize, canonicalize_record, unknown_venues
+from columnar_store import STORE_NAME, write_store
+from info_parser import REQUIRED_KEYS, parse_info, read_info
+from ingest_stats import STAGES, IngestStats
+from manifest import changed_matches, load_manifest, manifest_path, save_manifest
+from checkpoint import CHECKPOINT_MATCHES, Checkpoint, checkpoint_path, run_key
+from over_cube import MEASURES, OverCube, over_cube_path, over_totals, range_totals
+from player_stats import PlayerStats, player_lines, player_paths
+from prefetch import PREFETCH_THREADS, prefetch_pairs
+from record_accumulator import RecordAccumulator
+
+
+# (first, last) overs of the powerplay, middle and death overs, counting from 1
+PHASE_OVERS = [(1, 6), (7, 16), (17, 20)]
+
+# result fields of the (runs, wickets) totals for each phase
+PHASE_FIELDS = [('Runs_in_Powerplay', 'Wickets_lost_in_Powerplay'),
+                ('Runs_in_middle_overs', 'Wickets_lost_in_middle_overs'),
+                ('Runs_in_Death_overs', 'Wickets_lost_in_death_overs')]
+
+
+def innings_overs(dataf):
     '''
-    # calculate score for each over based on runs, extras and innings
-    :param df:  full dataframe
-    :param over: descriptor of [1,2,3] representing power, middle, and death overs
-    :return: (sum of runs + sum of extras, sum of wickets) for designated over
+    calculate the runs, extras, wickets and legal balls of every over of both innings of the game
+    :param dataf: full dataframe
+    :return: numpy array of shape (2 innings, 20 overs, 4 measures), see over_cube.py
     '''
-    # load ball data to parse dataframe on ie1==[0,6.1) 2 == [6.1,16.1) 3 == [16.1,end)
-    field = df['ball']
+    # ball is written as <over>.<delivery> with the overs counting from 0
+    over = dataf['ball'].to_numpy().astype(np.int64)
+    # runs scored from each ball
+    runs = dataf['runs_off_bat'].to_numpy() + dataf['extras'].to_numpy()
+    # a wicket fell if the wicket type holds a description (missing values are read as 'nan')
+    wickets = (dataf['wicket_type'].astype(str).str.len() > 3).to_numpy()
+    # wides and no balls are bowled again
+    legal_balls = (dataf['wides'].isna() & dataf['noballs'].isna()).to_numpy()
 
-    # switch on over
-    if over == 1:
-        # find index of all balls indexes less than 6.1
-        A = field[field < 6.1].index.tolist()
-        # remove all balls of above index from ball column leaving (balls >= 6.1)
-        field = field.drop(index=A)
+    # super overs are ignored
+    return over_totals(dataf['innings'].to_numpy(), over, runs, dataf['extras'].to_numpy(), wickets,
+                       legal_balls)
 
-    elif over == 2:
 
-        # find index of all balls over 16.1
-        A = field[field < 16.1].index.tolist()
-        B = set(A) - set(field[field < 6.1].index.tolist())
-
-        # remove all balls of above index from ball column leaving (balls >= 16.1 and balls < 6.1)
-        field = field.drop(index=B)
+def innings_totals(dataf, overs=None):
+    '''
+    calculate the score and wickets of each phase for both innings of the game in
+    a single pass over the ball by ball data
+    :param dataf: full dataframe
+    :param overs: per over totals from innings_overs, calculated when not given
+    :return: (first inning result, second inning result) dictionaries
+    '''
+    if overs is None:
+        overs = innings_overs(dataf)
+    runs, wickets = MEASURES.index('runs'), MEASURES.index('wickets')
+    # range sums over the overs of each phase, shape (phases, innings, measures)
+    phase_totals = np.stack([range_totals(overs, first, last) for first, last in PHASE_OVERS])
 
-    else:
-        # find index of all balls over 16.1
-        A = field[field >= 16.1].index.tolist()
-        # remove all balls of above index from ball column leaving (balls < 16.1)
-        field = field.drop(index=A)
+    innings = dataf['innings'].to_numpy()
+    results = []
+    for half_value in [1, 2]:
+        # find the first ball of the inning
+        first_ball = np.flatnonzero(innings == half_value)
+        if len(first_ball) == 0:
+            raise ValueError('No data for inning ' + str(half_value))
+        first_ball = first_ball[0]
 
-    # All remaining balls in the field are outside the over so find index of them
-    A = field[field > 0].index.tolist()
+        # initiate dictionary to hold result
+        result = {}
 
-    # load wicket, run and extra data from dataframe
-    wick = df['wicket_type']
-    run = df['runs_off_bat']
-    ex = df['extras']
+        # load data into results dictionary
+        result['team_A'] = [dataf['batting_team'].iat[first_ball]]
+        result['team_B'] = [dataf['bowling_team'].iat[first_ball]]
+        for (run_field, wicket_field), totals in zip(PHASE_FIELDS, phase_totals[:, half_value - 1]):
+            result[run_field], result[wicket_field] = [totals[runs]], [totals[wickets]]
 
-    # Use indexes based on "A" to remove values from wicket, run and extra data
-    wick = wick.drop(index=A).astype(str)
-    wick = wick.apply(lambda x: len(x) > 3) * 1  # convert text to int
-    run = run.drop(index=A)
-    ex = ex.drop(index=A)
+        # add all overs score to calculate total score and wickets
+        result['Total_Score_A'] = int(phase_totals[:, half_value - 1, runs].sum())
+        result['Total_Wicket_A'] = int(phase_totals[:, half_value - 1, wickets].sum())
 
-    # find sum of all values in each remaining column
-    w = wick.sum()
-    r = run.sum()
-    e = ex.sum()
+        results.append(result)
 
-    # return sum of runs and extras if first column and sum of wickets in second column
-    return [[r + e], [w]]
+    # return result dictionaries
+    return results[0], results[1]
 
 
 def inning(dataf, half_value):
@@ -64,35 +100,41 @@ def inning(dataf, half_value):
     :param half_value: which inning of the game we are looking at
     :return:
     '''
-    # pull inning data
-    field = dataf["innings"]
-    # find index of the inning data based on first or second inning of game
-    A = field[field != half_value].index.tolist()
-    # drop data from opposite inning
-    df = dataf.drop(index=A)
-    # reset index
-    df = df.reset_index()
-    # initiate dictionary to hold result
-    result = {}
+    assert half_value in [1, 2]
+
+    return innings_totals(dataf)[half_value - 1]
+
 
-    # load data into results dictionary
-    result['team_A'] = [df["batting_team"][0]]
-    result['team_B'] = [df["bowling_team"][0]]
-    result['Runs_in_Powerplay'], result['Wickets_lost_in_Powerplay'] = run_wickets(df, 1)
-    result['Runs_in_middle_overs'], result['Wickets_lost_in_middle_overs'] = run_wickets(df, 2)
-    result['Runs_in_Death_overs'], result['Wickets_lost_in_death_overs'] = run_wickets(df, 3)
+# columns of the ball by ball files used for the innings records
+MATCH_CSV_COLUMNS = ["match_id", "start_date", "venue", "innings", "ball", "batting_team",
+                     "bowling_team", "striker", "non_striker", "bowler", "runs_off_bat", "extras", "wides",
+                     "noballs", "wicket_type", "player_dismissed"]
 
-    # add all overs score to calculate total score and wickets
-    result['Total_Score_A'] = int(result['Runs_in_Powerplay'][0]) + \
-                              int(result['Runs_in_middle_overs'][0]) + \
-                              int(result['Runs_in_Death_overs'][0])
 
-    result['Total_Wicket_A'] = int(result['Wickets_lost_in_Powerplay'][0]) + \
-                               int(result['Wickets_lost_in_middle_overs'][0]) + \
-                               int(result['Wickets_lost_in_death_overs'][0])
+def info_fields(info):
+    '''
+    pull the fields of the innings records from the match information
+    :param info: MatchInfo record of the info.csv file
+    :return: (toss_winner, toss_decision, city, winner, event dictionary, 1 if the game has no winner else 0)
+    '''
+    result = {}
 
-    # return result dictionary
-    return result
+    # outcome only appears when there is no winner
+    if info.outcome is not None:
+        return result, 1
+
+    # pull required data
+    for key in ['toss_winner', 'toss_decision', 'city', 'winner']:
+        value = getattr(info, key)
+        if value is None:
+            raise KeyError(key)
+        result[key] = [value]
+    if info.event is not None:
+        result['event'] = [info.event]
+    else:
+        result['event'] = ['']
+
+    return result, 0
 
 
 def id_info_csv(path):
@@ -102,47 +144,44 @@ def id_info_csv(path):
     :return: toss_winner, toss_decision, city, winner
     '''
     assert isinstance(path, str)  # check for valid type input
-    # initialize return variable
-    result = {}
 
     try:
-        # read data as Length x 1 each row being stored as string in 1 column
-        dataframe = pd.read_csv(path, delimiter='\r')
-        # split loaded dataframe by comma into list
-        s = dataframe.squeeze().str.split(',')
-        # Shrink Series to column of fields
-        field = s.apply(lambda x: x[1])
-
-        # pull required data index's
-        winnerid = field[field == 'toss_winner'].index.tolist()
-        decisionid = field[field == 'toss_decision'].index.tolist()
-        cityid = field[field == 'city'].index.tolist()
-        winner = field[field == 'winner'].index.tolist()
-        outcomeid = field[field == 'outcome'].index.tolist()
-        eventid = field[field == 'event'].index.tolist()
-        # outcome only appears when there is no winner
-        if len(outcomeid) == 0:
-            outcomeid = 0
-            # pull data based on index values
-            result['toss_winner'] = [s.at[winnerid[0]][2]]
-            result['toss_decision'] = [s.at[decisionid[0]][2]]
-            result['city'] = [s.at[cityid[0]][2]]
-            result['winner'] = [s.at[winner[0]][2]]
-            if len(eventid)>0:
-                result['event'] = [s.at[eventid[0]][2]]
-            else:
-                result['event'] = ['']
-        else:
-            outcomeid = 1
-        # delete dataframe
-        del field
-
-        # return field results
-        return result, outcomeid
+        # read the info lines until the required data is found
+        return info_fields(read_info(path, REQUIRED_KEYS))
     except Exception as e:
         print(e)
         print('Error Occurred with path: ' + path)
-        print(result)
+
+
+def match_fields(dataframe, overs=None):
+    '''
+    Extract the data of both innings from the ball by ball data of a match
+    :param dataframe: ball by ball data with the MATCH_CSV_COLUMNS
+    :param overs: per over totals from innings_overs, calculated when not given
+    :return: (first inning, second inning) dictionaries
+    '''
+    # initialization of first inning dictionary
+    first_inning = {}
+
+    # retrieve constant data across the two innings
+    first_inning['id'] = str(dataframe["match_id"][0])
+    first_inning['year'] = [int(dataframe['start_date'][0].split('-')[0])]
+    first_inning['venue'] = [dataframe["venue"][0]]
+    second_inning = first_inning.copy()
+
+    # Create unique id for each inning
+    first_inning['id'] = [first_inning['id'] + 'A']
+    second_inning['id'] = [second_inning['id'] + 'B']
+
+    # Get Data from each inning
+    inn_1, inn_2 = innings_totals(dataframe, overs)
+
+    # Add all the data together
+    first_inning.update(inn_1)
+    second_inning.update(inn_2)
+
+    # return data from each inning
+    return first_inning, second_inning
 
 
 def id_csv(path):
@@ -153,108 +192,445 @@ def id_csv(path):
     '''
     assert isinstance(path, str)
 
-    # initialization of first inning dictionary
-    first_inning = {}
-
     try:
         # load data from file
-        dataframe = pd.read_csv(path, usecols=["match_id", "start_date", "venue", "innings",
-                                               "ball", "batting_team", "bowling_team", "runs_off_bat",
-                                               "extras", "wicket_type"])
+        dataframe = pd.read_csv(path, usecols=MATCH_CSV_COLUMNS)
+        return match_fields(dataframe)
+    except Exception as e:
+        print(e)
+        print('Error Occurred with path: ' + path)
 
-        # retrieve constant data across the two innings
-        first_inning['id'] = str(dataframe["match_id"][0])
-        first_inning['year'] = [int(dataframe['start_date'][0].split('-')[0])]
-        first_inning['venue'] = [dataframe["venue"][0]]
-        second_inning = first_inning.copy()
 
-        # Create unique id for each inning
-        first_inning['id'] = [first_inning['id'] + 'A']
-        second_inning['id'] = [second_inning['id'] + 'B']
+def match_files(input_directory_path):
+    '''
+    find the ball by ball files of the raw data directory
+    :param input_directory_path: local path to data directory or zip/tar archive
+    :return: list of <id>.csv file names
+    '''
+    if is_archive(input_directory_path):
+        # member names from the archive headers, in the order of the archive
+        files = list(archive_index(input_directory_path))
+    else:
+        files = os.listdir(input_directory_path)
+    # check if not an info file and if not a csv file
+    return [file for file in files if file[-8:-4] != 'info' and file[-3:] == 'csv']  # id.csv
 
-        # Get Data from each inning
-        inn_1 = inning(dataframe, 1)
-        inn_2 = inning(dataframe, 2)
 
-        # Add all the data together
-        first_inning.update(inn_1)
-        second_inning.update(inn_2)
+def finish_innings(field):
+    '''
+    turn the data collected for an inning into a complete innings record
+    :param field: innings dictionary from id_csv combined with the id_info_csv data
+    :return: innings record dictionary holding one value per field
+    '''
+    record = {key: value[0] if isinstance(value, list) else value for key, value in field.items()}
+
+    # Reduce duplications in stadium names using the names preceded by a comma
+    record['venue'] = record['venue'].split(',')[0]
+    # split the unique inning id into match id and A/B inning
+    record['match_id'], record['innings_number'] = record['id'][:-1], record['id'][-1]
+
+    return record
 
-        # delete the dataframe
-        del dataframe
 
-        # return data from each inning
-        return first_inning, second_inning
+def process_match(input_directory_path, file, data=None):
+    '''
+    Process a single <id>.csv / <id>_info.csv pair of the raw data directory
+    :param input_directory_path: local path to data directory
+    :param file: file name of the <id>.csv ball by ball file
+    :param data: (info bytes, csv bytes) of the pair when it was already read from an archive
+    or prefetched, None reads the files from input_directory_path
+    :return: (fieldA, fieldB, per over totals, player lines) of the match or None if the game was not finished or failed,
+    and a report dictionary with the status ('ok', 'skipped' or 'failed'), the time spent in each
+    stage, the number of balls read and the reason a match was skipped or the stage and error it failed with
+    '''
+    INFO_FNAME = os.path.join(input_directory_path, f"{file[:-4]}_info.csv")
+    CSV_PATH = os.path.join(input_directory_path, file)
+
+    timings = {stage: 0.0 for stage in STAGES}
+    report = {'file': file, 'status': 'ok', 'timings': timings, 'rows': 0}
+    stage = 'read'
+    start = time.perf_counter()
+
+    def next_stage(name):
+        # add the time of the running stage and start the next one, None stops timing
+        nonlocal stage, start
+        now = time.perf_counter()
+        timings[stage] += now - start
+        stage, start = name, now
+
+    try:
+        if data is None:
+            with open(INFO_FNAME, newline='', encoding='utf-8') as f:
+                info_text = f.read()
+        elif data[0] is None:
+            raise FileNotFoundError(f"{file[:-4]}_info.csv is not in the archive")
+        else:
+            info_text = data[0].decode('utf-8')
+        next_stage('parse')
+        # pull data from id_info.csv
+        match_info = parse_info(io.StringIO(info_text), REQUIRED_KEYS)
+        info, incomplete_game = info_fields(match_info)
+        # skip if game was not finished
+        if incomplete_game:
+            next_stage(None)
+            report['status'] = 'skipped'
+            report['reason'] = 'outcome: ' + match_info.outcome
+            return None, report
+
+        next_stage('read')
+        if data is None:
+            with open(CSV_PATH, 'rb') as f:
+                csv_data = f.read()
+        else:
+            csv_data = data[1]
+        next_stage('parse')
+        # pull data from id.csv
+        dataframe = pd.read_csv(io.BytesIO(csv_data), usecols=MATCH_CSV_COLUMNS)
+        report['rows'] = len(dataframe)
+        next_stage('aggregate')
+        overs = innings_overs(dataframe)
+        fieldA, fieldB = match_fields(dataframe, overs)
+        lines = player_lines(dataframe)
+
+        next_stage('merge')
+        # combine data from both files
+        fieldA.update(info)
+        fieldB.update(info)
+        fields = finish_innings(fieldA), finish_innings(fieldB), overs, lines
+        next_stage(None)
+
+        return fields, report
     except Exception as e:
+        report['status'] = 'failed'
+        report['stage'] = stage
+        report['error'] = f'{type(e).__name__}: {e}'
+        next_stage(None)
         print(e)
-        print('Error Occurred with path: ' + path)
+        print('Error Occurred with path: ' + os.path.join(input_directory_path, file))
+        return None, report
 
 
-def pre_process_data(input_directory_path, output_path):
+def _process_pair(input_directory_path, pair):
     '''
-    Runs the main loop for processing the data in each file and creating the
-    resultant data csv file which will be used in analysis
+    process_match for a (file, data) pair read from an archive or prefetched
+    '''
+    file, data = pair
+    return process_match(input_directory_path, file, data)
+
 
+def iter_matches(input_directory_path, files=None, workers=1, stats=None, overs=None, players=None,
+                 prefetch=PREFETCH_THREADS, done=None):
+    '''
+    Generator over the finished matches of the raw data directory, only the matches
+    being processed are held in memory
+    :param input_directory_path: local path to data directory, or a zip/tar archive whose
+    members are read directly without extracting them
+    :param files: <id>.csv file names to process, default is every match in the directory
+    :param workers: number of worker processes to spread the matches over, 1 runs serially
+    :param stats: IngestStats collecting the timings, skipped matches and failures
+    :param overs: OverCube collecting the per over totals of the yielded matches
+    :param players: PlayerStats collecting the batting and bowling lines of the yielded matches
+    :param prefetch: number of threads reading the files of the upcoming matches of a directory
+    while the current ones are processed, 0 reads every file when its match is processed
+    :param done: list collecting the <id>.csv names of the processed files, including the skipped and
+    failed matches
+    :return: yields (fieldA, fieldB) innings records in the order of files, for an archive
+    in the order the pairs are completed while reading it
+    '''
+    assert isinstance(workers, int) and workers >= 1
+    assert isinstance(prefetch, int) and prefetch >= 0
+
+    if files is None:
+        files = match_files(input_directory_path)
+
+    if is_archive(input_directory_path):
+        # the archive is read once front to back and the members are handed over in memory
+        items = iter_match_pairs(input_directory_path, files, stats)
+        process = partial(_process_pair, input_directory_path)
+    elif prefetch > 0:
+        # overlap the waiting on the disk with the processing of the previous matches
+        items = prefetch_pairs(input_directory_path, files, prefetch, stats)
+        process = partial(_process_pair, input_directory_path)
+    else:
+        items = files
+        process = partial(process_match, input_directory_path)
+
+    if workers == 1:
+        results = map(process, items)
+    else:
+        results = _pool_results(process, items, workers)
+
+    for fields, report in results:
+        if stats is not None:
+            stats.add_match(report)
+        if done is not None:
+            done.append(report['file'])
+        # skip if game was not finished or could not be processed
+        if fields is not None:
+            fieldA, fieldB, match_overs, lines = fields
+            if overs is not None:
+                overs.append(int(fieldA['match_id']), match_overs)
+            if players is not None:
+                players.append(int(fieldA['match_id']), lines)
+            yield fieldA, fieldB
+
+
+def _pool_results(process, items, workers):
+    '''
+    process the files with a pool of worker processes
+    :param process: function processing a single file
+    :param items: iterable of the file names (or archive pairs) to process
+    :param workers: number of worker processes
+    :return: yields the results in the order of items
+    '''
+    # hand the files to the pool in bounded windows so results can not pile up
+    # in memory when the consumer is slower than the workers
+    window = workers * 16
+    items = iter(items)
+    with Pool(workers) as pool:
+        while True:
+            chunk = list(islice(items, window))
+            if not chunk:
+                break
+            # results come back in the order of items so the output matches the serial run
+            yield from pool.imap(process, chunk)
+
+
+def iter_innings(input_directory_path, files=None, workers=1, stats=None, overs=None, players=None,
+                 prefetch=PREFETCH_THREADS):
+    '''
+    Generator over the innings records of the raw data directory, one record at a time
     :param input_directory_path: local path to data directory
+    :param files: <id>.csv file names to process, default is every match in the directory
+    :param workers: number of worker processes to spread the matches over, 1 runs serially
+    :param stats: IngestStats collecting the timings, skipped matches and failures
+    :param overs: OverCube collecting the per over totals of the yielded matches
+    :param players: PlayerStats collecting the batting and bowling lines of the yielded matches
+    :param prefetch: number of threads reading the files of the upcoming matches, 0 disables prefetching
+    :return: yields innings record dictionaries, first inning followed by second inning of each match
+    '''
+    for fieldA, fieldB in iter_matches(input_directory_path, files, workers, stats, overs, players, prefetch):
+        # add the canonical venue and city
+        yield canonicalize_record(fieldA)
+        yield canonicalize_record(fieldB)
+
+
+def write_innings_csv(innings, output_path):
+    '''
+    Write innings records to a csv file as they arrive, the file has the same format as
+    the one written by pre_process_data
+    :param innings: iterable of innings records, eg. iter_innings()
     :param output_path: local path to database storage location
-    :return:
+    :return: number of innings written
     '''
+    n = 0
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        # Game Count
+        k = -1
+        match_id = None
+        for record in innings:
+            if n == 0:
+                writer.writerow([''] + list(record.keys()))
+            # both innings of a game share the game count
+            if record['match_id'] != match_id:
+                match_id = record['match_id']
+                k += 1
+            writer.writerow([k] + list(record.values()))
+            n += 1
+    return n
 
-    files = os.listdir(input_directory_path)
 
-    # create result dataframe
-    frame = pd.DataFrame()
+def pre_process_data(input_directory_path, output_path, workers=1, incremental=False, store_path=None,
+                     report_path=None, prefetch=PREFETCH_THREADS, resume=False,
+                     checkpoint_matches=CHECKPOINT_MATCHES):
+    '''
+    Runs the main loop for processing the data in each file and creating the
+    resultant data csv file which will be used in analysis
 
-    # Game Count
+    :param input_directory_path: local path to data directory, or a zip/tar archive of it
+    :param output_path: local path to database storage location
+    :param workers: number of worker processes to spread the matches over, 1 runs serially
+    :param incremental: only process matches which are new or changed since the last incremental run
+    and merge them into the existing database at output_path, failed matches are processed again
+    by every incremental run. A run which is not incremental removes the manifest
+    :param store_path: directory to also write the data to as a parquet store sorted by year and event
+    :param report_path: path to write the json report of timings, throughput, skipped matches and failures to
+    :param prefetch: number of threads reading the files of the upcoming matches while the current ones are
+    processed, 0 disables prefetching
+    :param resume: continue the run which was interrupted with the same files from its last checkpoint
+    :param checkpoint_matches: number of matches processed between two checkpoints
+    :return: summary dictionary of the run
+
+    The per over totals of every inning are written next to the output (Result_overs.npz), see over_cube.py,
+    and so are the batting and bowling lines of every player and their career rollups (Result_batting.csv,
+    Result_bowling.csv, Result_batting_careers.csv and Result_bowling_careers.csv), see player_stats.py
+
+    The processed matches are committed in batches to a checkpoint next to the output (Result.csv.checkpoint)
+    which is removed once the output is written, see checkpoint.py
+    '''
+    assert isinstance(workers, int) and workers >= 1
+    assert isinstance(checkpoint_matches, int) and checkpoint_matches >= 1
+
+    stats = IngestStats()
+    files = match_files(input_directory_path)
+
+    # compare the files against the manifest of the last run
+    MANIFEST_PATH = manifest_path(output_path)
+    OVERS_PATH = over_cube_path(output_path)
+    manifest = load_manifest(MANIFEST_PATH) if incremental else {}
+    existing = None
+    existing_players = PlayerStats()
+    PLAYER_PATHS = player_paths(output_path)
+    if incremental and manifest and os.path.exists(output_path) and os.path.exists(OVERS_PATH) \
+            and all(os.path.exists(path) for path in PLAYER_PATHS.values()):
+        existing = pd.read_csv(output_path, index_col=0, dtype=str, keep_default_na=False)
+        existing.index = existing.index.astype('int64')
+        existing_overs = OverCube.load(OVERS_PATH)
+        existing_players = PlayerStats.load(output_path)
+    else:
+        # nothing to merge into so every match is processed
+        manifest = {}
+    if incremental:
+        files, removed, signatures = changed_matches(input_directory_path, files, manifest)
+    else:
+        # a full run does not look at the manifest, so the files are not signed
+        removed, signatures = [], {}
+    if existing is not None:
+        # the lines of changed and removed matches are collected again below
+        existing_players.drop([int(file[:-4]) for file in files] + [int(match_id) for match_id in removed])
+
+    # continue from the batches committed by an interrupted run of the same files
+    checkpoint = Checkpoint(checkpoint_path(output_path), run_key(input_directory_path, files, incremental))
+    if not (resume and checkpoint.resume()):
+        checkpoint.clear()
+    frames, resumed_overs, resumed_players = checkpoint.load()
+    committed = checkpoint.done
+    if committed:
+        print(f"Resuming after {len(committed)} files")
+
+    # create result accumulator, the dataframe of a batch is built when it is committed
+    records = RecordAccumulator()
+    overs = OverCube()
+    players = PlayerStats()
+    done = []
+
+    # Game Count, continued after the games already in the database
     k = 0
-    # loop over files in directory
-    for file in files:
-        # check if not an info file and if not a csv file
-        if file[-8:-4] != 'info' and file[-3:] == 'csv':  # id.csv
-
-            INFO_FNAME = os.path.join(DATA_PATH, f"{file[:-4]}_info.csv")
-            # pull data from id_info.csv
-            info, incomplete_game = id_info_csv(INFO_FNAME)
-            # skip if game was not finished
-            if not incomplete_game:
-                CSV_PATH = os.path.join(DATA_PATH, file)
-
-                # pull data from id.csv
-                fieldA, fieldB = id_csv(CSV_PATH)
-
-                # combine data from both files
-                fieldA.update(info)
-                fieldB.update(info)
-
-                # just deleting info for ease of reading debugger
-                del info
-
-                # add data to dataframe
-                frame = pd.concat([frame, pd.DataFrame(fieldA, index=[k])])
-                frame = pd.concat([frame, pd.DataFrame(fieldB, index=[k])])
-
-                # just deleting info for ease of reading debugger
-                del fieldA
-                del fieldB
-                print(k)
-                k += 1
-
-    # Updating the frame to remove duplicates
-    # Reduce duplications in stadium names using the names preceded by a comma
-    frame[['match_id', 'innings_number']] = frame.id.str.extract(r'(.*)(.{1})', expand=True)
-    frame['venue'] = frame.venue.str.split(',').str[0]
+    if existing is not None and len(existing) > 0:
+        k = int(existing.index.max()) + 1
+    if checkpoint.next_index is not None:
+        k = checkpoint.next_index
+    # loop over processed matches
+    for fieldA, fieldB in iter_matches(input_directory_path, [file for file in files if file not in committed],
+                                       workers, stats, overs, players, prefetch, done):
+        # add data to accumulator
+        with stats.timer('merge'):
+            records.append(fieldA, k)
+            records.append(fieldB, k)
+
+        # just deleting info for ease of reading debugger
+        del fieldA
+        del fieldB
+        k += 1
+
+        # make the processed matches durable
+        if len(records) >= 2 * checkpoint_matches:
+            with stats.timer('merge'):
+                frames.append(records.to_frame())
+                checkpoint.commit(frames[-1], overs, players, done, k,
+                                  [failure['file'] for failure in stats.failures])
+                records = RecordAccumulator()
+
+    with stats.timer('merge'):
+        if len(records) or not frames:
+            frames.append(records.to_frame())
+        frame = pd.concat(frames) if len(frames) > 1 else frames[0]
+        overs = resumed_overs.concat(overs)
+        players = existing_players.concat(resumed_players).concat(players)
+
+        if existing is not None:
+            # replace the rows of changed and removed matches with the newly processed ones
+            stale = [file[:-4] for file in files] + removed
+            existing = existing[~existing['match_id'].isin(stale)]
+            frame = pd.concat([existing, frame])
+            overs = existing_overs.drop([int(match_id) for match_id in stale]).concat(overs)
+
+        # canonical venue and city of every row, the existing rows are mapped again in case the
+        # alias table changed
+        frame = canonicalize(frame)
+        unknown = unknown_venues(frame['updated_venue'], cache_path=output_path + '.venue_suggestions.json')
+        stats.add_unknown_venues(unknown)
+        for venue, suggestions in unknown.items():
+            print(f"Unknown venue {venue}, add it to venue_aliases.csv (did you mean {', '.join(suggestions)}?)")
 
     frame.to_csv(output_path)
+    overs.save(OVERS_PATH)
+    players.save(output_path)
+    if store_path is not None:
+        write_store(frame, store_path)
 
-    return True
+    if incremental:
+        # record the ingested files for the next incremental run, failed matches are left out
+        # so they are processed again
+        failed = {file[:-4] for file in checkpoint.failed} | {failure['file'][:-4] for failure in stats.failures}
+        save_manifest({match_id: signature for match_id, signature in signatures.items() if match_id not in failed},
+                      MANIFEST_PATH)
+    elif os.path.exists(MANIFEST_PATH):
+        # the manifest of an earlier run no longer describes the rewritten output
+        os.remove(MANIFEST_PATH)
+    checkpoint.clear()
+
+    summary = stats.write_report(report_path) if report_path is not None else stats.summary()
+    print(f"{summary['matches']} matches, {len(summary['skipped'])} skipped, "
+          f"{len(summary['failures'])} failed in {summary['wall_seconds']} s")
+
+    return summary
 
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Process the raw cricsheet data into a single database')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes used to process the matches (default: 1)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only process new or changed matches and merge them into the existing database')
+    parser.add_argument('--store', action='store_true',
+                        help='also write the data to the parquet store sorted by year and event '
+                             'which the visualizations load (DataProcessing/result_post_step_store)')
+    parser.add_argument('--streaming', action='store_true',
+                        help='write the innings to the csv file as they are processed, in constant memory')
+    parser.add_argument('--report', action='store_true',
+                        help='write timings, throughput, skipped matches and failures to ingest_report.json')
+    parser.add_argument('--prefetch', type=int, default=PREFETCH_THREADS,
+                        help=f'threads reading the upcoming matches ahead of processing, 0 disables '
+                             f'(default: {PREFETCH_THREADS})')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue an interrupted run from its last checkpoint')
+    parser.add_argument('--input', default=None,
+                        help='raw data directory or cricsheet zip/tar archive (default: Raw Data/t20s_male_csv_files)')
+    args = parser.parse_args()
+
     # path to directory
     BASE_PATH = os.getcwd()
-    DATA_PATH = os.path.join(BASE_PATH, "Raw Data", "t20s_male_csv_files")
+    DATA_PATH = args.input or os.path.join(BASE_PATH, "Raw Data", "t20s_male_csv_files")
     # path to save location
     SAVE_PATH = os.path.join(BASE_PATH, "DataProcessing", "Result.csv")
-
-    pre_process_data(DATA_PATH,SAVE_PATH)
\ No newline at end of file
+    # the store is read by the visualizations, see load_database in DataVisualization/load_data.py
+    STORE_PATH = os.path.join(BASE_PATH, "DataProcessing", STORE_NAME) if args.store else None
+    REPORT_PATH = os.path.join(BASE_PATH, "DataProcessing", "ingest_report.json") if args.report else None
+
+    if args.streaming:
+        stats = IngestStats()
+        overs = OverCube()
+        players = PlayerStats()
+        write_innings_csv(iter_innings(DATA_PATH, workers=args.workers, stats=stats, overs=overs, players=players,
+                                       prefetch=args.prefetch), SAVE_PATH)
+        overs.save(over_cube_path(SAVE_PATH))
+        players.save(SAVE_PATH)
+        if REPORT_PATH is not None:
+            stats.write_report(REPORT_PATH)
+    else:
+        pre_process_data(DATA_PATH, SAVE_PATH, workers=args.workers, incremental=args.incremental,
+                         store_path=STORE_PATH, report_path=REPORT_PATH, prefetch=args.prefetch,
+                         resume=args.resume)
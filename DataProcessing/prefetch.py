@@ -0,0 +1,66 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# reader threads used by default, reading is waiting on the disk so a few threads are
+# enough to keep the parsing busy even on network mounted storage
+PREFETCH_THREADS = 4
+
+# pairs read ahead of the match being processed for each reader thread
+PAIRS_PER_THREAD = 8
+
+
+def read_pair(input_directory_path, file):
+    '''
+    read the <id>_info.csv and <id>.csv files of a match
+    :param input_directory_path: local path to data directory
+    :param file: file name of the <id>.csv ball by ball file
+    :return: (info bytes, csv bytes), or None if a file could not be read so the match
+    is read again (and fails) where it is processed
+    '''
+    try:
+        with open(os.path.join(input_directory_path, f"{file[:-4]}_info.csv"), 'rb') as f:
+            info_data = f.read()
+        with open(os.path.join(input_directory_path, file), 'rb') as f:
+            csv_data = f.read()
+    except OSError:
+        return None
+    return info_data, csv_data
+
+
+def prefetch_pairs(input_directory_path, files, threads=PREFETCH_THREADS, stats=None):
+    '''
+    Generator reading the file pairs of the upcoming matches on a pool of threads while the
+    current match is processed, at most threads * PAIRS_PER_THREAD pairs are held in memory
+    :param input_directory_path: local path to data directory
+    :param files: <id>.csv file names to read
+    :param threads: number of reader threads
+    :param stats: IngestStats, the time spent waiting for a pair which was not read yet is
+    added to the read stage
+    :return: yields (<id>.csv name, (info bytes, csv bytes) or None) in the order of files
+    '''
+    assert isinstance(threads, int) and threads >= 1
+
+    depth = threads * PAIRS_PER_THREAD
+    files = iter(files)
+    with ThreadPoolExecutor(threads, thread_name_prefix='prefetch') as executor:
+        # bounded queue of the pairs being read, in the order of files
+        queue = deque()
+        for file in files:
+            queue.append((file, executor.submit(read_pair, input_directory_path, file)))
+            if len(queue) == depth:
+                break
+
+        while queue:
+            file, future = queue.popleft()
+            start = time.perf_counter()
+            data = future.result()
+            if stats is not None:
+                stats.add_time('read', time.perf_counter() - start)
+            # refill the queue before the pair is handed on to be processed
+            file_next = next(files, None)
+            if file_next is not None:
+                queue.append((file_next, executor.submit(read_pair, input_directory_path, file_next)))
+            yield file, data
@@ -0,0 +1,76 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from schema import array_typecodes
+
+
+# typecodes for the numeric fields of the processed innings records,
+# every field not listed here is stored as a python object (strings)
+INNINGS_FIELD_TYPES = array_typecodes()
+
+
+class RecordAccumulator:
+    '''
+    Append friendly column store for record dictionaries. Every field is kept in
+    its own buffer (a typed array for numeric fields, a list otherwise) and the
+    dataframe is only built once when calling to_frame()
+    '''
+
+    def __init__(self, field_types=None):
+        '''
+        :param field_types: dictionary of field name -> array typecode for numeric fields
+        '''
+        if field_types is None:
+            field_types = INNINGS_FIELD_TYPES
+        assert isinstance(field_types, dict)
+
+        self.field_types = field_types
+        # columns are created in the order the fields are first seen
+        self.columns = {}
+        self.index = array('q')
+
+    def __len__(self):
+        return len(self.index)
+
+    def append(self, record, index):
+        '''
+        add a single record to the accumulator
+        :param record: dictionary of field -> value, single element lists are unpacked
+        :param index: index label of the record in the resulting dataframe
+        :return:
+        '''
+        assert isinstance(record, dict)
+
+        # every record has to hold the same fields as the first one
+        if self.columns and record.keys() != self.columns.keys():
+            raise ValueError('Record fields do not match the accumulated fields')
+
+        for field, value in record.items():
+            # values are wrapped in lists for pd.DataFrame(record, index=[k])
+            if isinstance(value, list):
+                value = value[0]
+
+            column = self.columns.get(field)
+            if column is None:
+                typecode = self.field_types.get(field)
+                column = array(typecode) if typecode is not None else []
+                self.columns[field] = column
+            column.append(value)
+
+        self.index.append(index)
+
+    def to_frame(self):
+        '''
+        build the dataframe holding all of the appended records
+        :return: pandas DataFrame
+        '''
+        data = {}
+        for field, column in self.columns.items():
+            if isinstance(column, array):
+                data[field] = np.array(column, dtype=column.typecode)
+            else:
+                data[field] = column
+
+        return pd.DataFrame(data, index=np.array(self.index, dtype='q'))
@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+
+
+# compact in memory schema of the processed innings table, column name -> dtype
+INNINGS_SCHEMA = {
+    'id': 'object',
+    'year': 'uint16',
+    'venue': 'category',
+    'team_A': 'category',
+    'team_B': 'category',
+    'Runs_in_Powerplay': 'uint16',
+    'Wickets_lost_in_Powerplay': 'uint8',
+    'Runs_in_middle_overs': 'uint16',
+    'Wickets_lost_in_middle_overs': 'uint8',
+    'Runs_in_Death_overs': 'uint16',
+    'Wickets_lost_in_death_overs': 'uint8',
+    'Total_Score_A': 'uint16',
+    'Total_Wicket_A': 'uint8',
+    'toss_winner': 'category',
+    'toss_decision': 'category',
+    'city': 'category',
+    'winner': 'category',
+    'event': 'category',
+    'match_id': 'int64',
+    # 1 for the first and 2 for the second inning
+    'innings_number': 'int8',
+    'updated_venue': 'category',
+    'update_city': 'category',
+    # derived from the columns above, see derive_columns
+    'batting_first': 'bool',
+    'won': 'bool',
+    'in_australia': 'bool',
+}
+
+# derived column -> columns it is computed from
+DERIVED_COLUMNS = {
+    'batting_first': ['innings_number'],
+    'won': ['team_A', 'winner'],
+    'in_australia': ['updated_venue'],
+}
+
+# venues of the T20WC 2022 and the other australian grounds of the data
+AUSTRALIA_VENUES = ['Sydney Cricket Ground', 'Brisbane Cricket Ground', 'Melbourne Cricket Ground', 'GMHBA Stadium',
+                    'Perth Stadium', 'Manuka Oval', 'Bellerive Oval', 'Carrara Oval', 'Adelaide Oval']
+
+# categorical columns sharing one dictionary so they can be compared with each other,
+# eg. team_A == winner
+SHARED_CATEGORIES = [
+    ['team_A', 'team_B', 'toss_winner', 'winner'],
+    ['venue', 'updated_venue'],
+    ['city', 'update_city'],
+]
+
+# innings_number of the csv files -> innings_number of the schema
+INNINGS_NUMBERS = {'A': 1, 'B': 2}
+
+# array typecodes of the integer dtypes
+ARRAY_TYPECODES = {'uint8': 'B', 'uint16': 'H', 'int8': 'b', 'int64': 'q'}
+
+
+def _category_groups(columns):
+    '''
+    group the categorical columns by the dictionary they share
+    :param columns: column names of the frame
+    :return: list of column name lists
+    '''
+    shared = [column for group in SHARED_CATEGORIES for column in group]
+    groups = [[column for column in group if column in columns] for group in SHARED_CATEGORIES]
+    groups += [[column] for column in columns
+               if INNINGS_SCHEMA.get(column) == 'category' and column not in shared]
+    return [group for group in groups if group]
+
+
+def apply_schema(frame):
+    '''
+    convert the processed innings table to the compact schema, columns which are not
+    part of the schema are kept as they are
+    :param frame: processed data ; pandas Dataframe
+    :return: pandas Dataframe with the INNINGS_SCHEMA dtypes
+    '''
+    assert isinstance(frame, pd.DataFrame)
+
+    # drop the csv index column
+    frame = frame.loc[:, [column for column in frame.columns if not str(column).startswith('Unnamed')]].copy()
+
+    if 'innings_number' in frame.columns and frame['innings_number'].dtype == object:
+        frame['innings_number'] = frame['innings_number'].str.strip().map(INNINGS_NUMBERS)
+
+    for column in frame.columns:
+        dtype = INNINGS_SCHEMA.get(column)
+        if dtype not in [None, 'object', 'category']:
+            frame[column] = frame[column].astype(dtype)
+
+    for group in _category_groups(frame.columns):
+        # one sorted dictionary of every value in the group, blank strings are missing values
+        values = set()
+        if all(isinstance(frame[column].dtype, pd.CategoricalDtype) for column in group):
+            # only the dictionaries are merged, the rows are recoded through their codes
+            for column in group:
+                codes = frame[column].cat.codes.to_numpy()
+                values.update(frame[column].cat.categories[np.unique(codes[codes >= 0])])
+            values.discard('')
+        else:
+            for column in group:
+                frame[column] = frame[column].astype(object).where(frame[column].notna(), None)
+                frame[column] = frame[column].where(frame[column] != '', None)
+                values.update(frame[column].dropna().unique())
+        dtype = pd.CategoricalDtype(sorted(values))
+        for column in group:
+            frame[column] = frame[column].astype(dtype)
+
+    return derive_columns(frame)
+
+
+def ensure_schema(frame):
+    '''
+    the processed innings table in the compact schema: a frame read with a plain pd.read_csv
+    ('A'/'B' innings_number, string teams, ...) is converted with apply_schema, a frame which
+    already uses the schema is returned as it is
+    :param frame: processed data ; pandas Dataframe
+    :return: pandas Dataframe with the INNINGS_SCHEMA dtypes
+    '''
+    assert isinstance(frame, pd.DataFrame)
+
+    for column in frame.columns:
+        dtype = INNINGS_SCHEMA.get(column)
+        if dtype not in [None, 'object'] and str(frame[column].dtype) != dtype:
+            return apply_schema(frame)
+    return frame
+
+
+def derive_columns(frame):
+    '''
+    add the DERIVED_COLUMNS which are missing and whose source columns are in the frame, as
+    vectorized boolean columns:
+    batting_first   the innings is the first inning of the match
+    won             team_A won the match
+    in_australia    the match was played at one of the AUSTRALIA_VENUES
+    :param frame: processed data ; pandas Dataframe, in the compact schema or as read from the csv
+    :return: the frame with the derived columns
+    '''
+    assert isinstance(frame, pd.DataFrame)
+
+    if 'batting_first' not in frame.columns:
+        if 'innings_number' in frame.columns:
+            numbers = frame['innings_number']
+            if numbers.dtype == object:
+                numbers = numbers.str.strip().map(INNINGS_NUMBERS)
+            frame['batting_first'] = (numbers == 1).to_numpy()
+        elif 'id' in frame.columns:
+            # the id of the first inning ends with A
+            frame['batting_first'] = (frame['id'].str[-1] == 'A').to_numpy()
+    if 'won' not in frame.columns and 'team_A' in frame.columns and 'winner' in frame.columns:
+        # categoricals are only comparable when they share the categories
+        same = isinstance(frame['team_A'].dtype, pd.CategoricalDtype) and frame['team_A'].dtype == frame['winner'].dtype
+        team_A, winner = (frame['team_A'], frame['winner']) if same else (frame['team_A'].astype(object), frame['winner'].astype(object))
+        frame['won'] = (team_A == winner).to_numpy()
+    if 'in_australia' not in frame.columns and 'updated_venue' in frame.columns:
+        frame['in_australia'] = frame['updated_venue'].isin(AUSTRALIA_VENUES).to_numpy()
+    return frame
+
+
+def source_columns(columns, available=None):
+    '''
+    columns to read for the requested columns, the derived columns are replaced by their sources
+    unless they are available
+    :param columns: requested columns
+    :param available: columns which can be read, eg. of a store written with the derived columns
+    :return: list of column names
+    '''
+    available = available if available is not None else []
+    read = []
+    for column in columns:
+        sources = DERIVED_COLUMNS[column] if column in DERIVED_COLUMNS and column not in available else [column]
+        read += [source for source in sources if source not in read]
+    return read
+
+
+def csv_dtypes(columns=None):
+    '''
+    dtypes to read the processed csv files with so strings are not materialized per row
+    :param columns: columns which are read, default is every column of the schema
+    :return: dictionary for the dtype argument of pd.read_csv
+    '''
+    if columns is None:
+        columns = INNINGS_SCHEMA
+    return {column: 'category' for column in columns if INNINGS_SCHEMA.get(column) == 'category'}
+
+
+def array_typecodes():
+    '''
+    array typecodes of the integer columns of the schema, used while accumulating records
+    :return: dictionary of column -> typecode
+    '''
+    return {column: ARRAY_TYPECODES[dtype] for column, dtype in INNINGS_SCHEMA.items()
+            if dtype in ARRAY_TYPECODES and column not in ['match_id', 'innings_number']}
+
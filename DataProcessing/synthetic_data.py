@@ -0,0 +1,244 @@
+import argparse
+import os
+import zipfile
+import zlib
+from datetime import date, timedelta
+
+import numpy as np
+
+
+# header of the cricsheet ball by ball files
+BALL_HEADER = ['match_id', 'season', 'start_date', 'venue', 'innings', 'ball', 'batting_team', 'bowling_team',
+               'striker', 'non_striker', 'bowler', 'runs_off_bat', 'extras', 'wides', 'noballs', 'byes',
+               'legbyes', 'penalty', 'wicket_type', 'player_dismissed', 'other_wicket_type',
+               'other_player_dismissed']
+
+TEAMS = ['Australia', 'England', 'India', 'Pakistan', 'New Zealand', 'South Africa', 'Sri Lanka',
+         'West Indies', 'Bangladesh', 'Afghanistan', 'Ireland', 'Zimbabwe', 'Netherlands', 'Scotland',
+         'Namibia', 'United Arab Emirates']
+
+# (venue, city), some venues carry the city after a comma like the cricsheet data does
+VENUES = [('Melbourne Cricket Ground', 'Melbourne'), ('Eden Gardens', 'Kolkata'), ('Lord\'s, London', 'London'),
+          ('Newlands', 'Cape Town'), ('Eden Park', 'Auckland'), ('Gaddafi Stadium, Lahore', 'Lahore'),
+          ('Kensington Oval, Bridgetown', 'Bridgetown'), ('Sportpark Het Schootsveld', 'Deventer'),
+          ('Dubai International Cricket Stadium', 'Dubai'), ('The Grange Club', 'Edinburgh')]
+
+EVENTS = ['T20I Series', 'Tri-Nation T20I Series', "ICC Men's T20 World Cup", 'T20 World Cup Qualifier']
+
+WICKET_TYPES = ['caught', 'bowled', 'lbw', 'run out', 'stumped', 'caught and bowled']
+
+# share of the matches for each kind of match, the rest are complete 20 over matches
+KIND_SHARES = {'no_result': 0.03, 'super_over': 0.02, 'shortened': 0.08}
+# share of the matches without an event line
+MISSING_EVENT_SHARE = 0.04
+
+# first synthetic match id, far above the cricsheet ids
+FIRST_MATCH_ID = 9000000
+
+
+def players(team):
+    '''
+    the eleven players of a synthetic team
+    :param team: team name
+    :return: list of player names
+    '''
+    return [f"{team[:3].upper()} Player {k}" for k in range(1, 12)]
+
+
+def simulate_innings(rng, overs, max_wickets=10, target=None):
+    '''
+    simulate the deliveries of an inning
+    :param rng: numpy Generator
+    :param overs: maximum number of (6 legal ball) overs
+    :param max_wickets: the inning ends when this many wickets fell
+    :param target: the inning ends once this many runs are scored, None plays all overs
+    :return: dictionary of numpy arrays, one entry per delivery
+    '''
+    # draw more deliveries than can be bowled and cut them at the end of the inning
+    n = overs * 6 * 2
+    wides = rng.random(n) < 0.03
+    noballs = ~wides & (rng.random(n) < 0.01)
+    legal = ~wides & ~noballs
+    legbyes = legal & (rng.random(n) < 0.03)
+    runs_off_bat = rng.choice([0, 1, 2, 3, 4, 6], size=n, p=[0.38, 0.36, 0.08, 0.01, 0.12, 0.05])
+    runs_off_bat[wides | legbyes] = 0
+    extras = wides.astype(int) + noballs + legbyes
+    wicket = legal & ~legbyes & (rng.random(n) < 0.05)
+    runs_off_bat[wicket] = 0
+
+    # over and delivery number of each ball, deliveries which are not legal are bowled again
+    legal_before = np.cumsum(legal) - legal
+    over = legal_before // 6
+    delivery = np.arange(n) - np.searchsorted(over, over) + 1
+
+    # end of the inning: out of overs, all out or target reached
+    end = np.searchsorted(legal_before, overs * 6)
+    wickets_fallen = np.cumsum(wicket)
+    end = min(end, np.searchsorted(wickets_fallen, max_wickets) + 1)
+    if target is not None:
+        end = min(end, np.searchsorted(np.cumsum(runs_off_bat + extras), target) + 1)
+    end = min(end, n)
+
+    return {'over': over[:end], 'delivery': delivery[:end], 'runs_off_bat': runs_off_bat[:end],
+            'extras': extras[:end], 'wides': wides[:end], 'noballs': noballs[:end], 'legbyes': legbyes[:end],
+            'wicket': wicket[:end], 'wickets_before': (wickets_fallen - wicket)[:end],
+            'wicket_type': rng.integers(0, len(WICKET_TYPES), size=end)}
+
+
+def _quote(value):
+    '''
+    quote a csv field holding a comma
+    '''
+    return f'"{value}"' if ',' in value else value
+
+
+def _ball_lines(match_id, season, start_date, venue, innings_number, batting, bowling, balls):
+    '''
+    ball by ball csv lines of a simulated inning
+    '''
+    batters = players(batting)
+    bowlers = players(bowling)[6:][::-1]
+
+    venue = _quote(venue)
+    lines = []
+    for i in range(len(balls['over'])):
+        over = int(balls['over'][i])
+        wickets_before = int(balls['wickets_before'][i])
+        striker = batters[min(wickets_before + (i % 2), 10)]
+        non_striker = batters[min(wickets_before + 1 - (i % 2), 10)]
+        wicket_type = WICKET_TYPES[balls['wicket_type'][i]] if balls['wicket'][i] else ''
+        lines.append(','.join([
+            str(match_id), season, start_date, venue, str(innings_number), f"{over}.{balls['delivery'][i]}",
+            batting, bowling, striker, non_striker, bowlers[over % len(bowlers)],
+            str(balls['runs_off_bat'][i]), str(balls['extras'][i]),
+            '1' if balls['wides'][i] else '', '1' if balls['noballs'][i] else '', '',
+            '1' if balls['legbyes'][i] else '', '', wicket_type, striker if wicket_type else '', '', '']))
+    return lines
+
+
+def synthetic_match(match_id, seed=0):
+    '''
+    Generate a valid cricsheet <id>.csv / <id>_info.csv pair, the match only depends on
+    match_id and seed so every data set is a prefix of the larger ones.
+    Covers complete matches, no result matches, tied matches decided by a super over,
+    rain shortened (D/L) matches, innings bowled out before 20 overs and matches without an event
+    :param match_id: cricsheet match id
+    :param seed: seed of the data set
+    :return: (ball by ball csv text, info csv text)
+    '''
+    rng = np.random.default_rng([seed, match_id])
+
+    team_1, team_2 = rng.choice(TEAMS, size=2, replace=False).tolist()
+    venue, city = VENUES[rng.integers(len(VENUES))]
+    day = date(2005, 2, 17) + timedelta(days=int(rng.integers(0, 18 * 365)))
+    start_date = day.isoformat()
+    season = str(day.year)
+    toss_winner = [team_1, team_2][rng.integers(2)]
+    toss_decision = ['bat', 'field'][rng.integers(2)]
+    batting_first = toss_winner if toss_decision == 'bat' else (team_2 if toss_winner == team_1 else team_1)
+    bowling_first = team_2 if batting_first == team_1 else team_1
+
+    draw = rng.random()
+    kind = 'complete'
+    for name, share in KIND_SHARES.items():
+        if draw < share:
+            kind = name
+            break
+        draw -= share
+
+    overs = int(rng.integers(5, 20)) if kind == 'shortened' else 20
+    innings = [(batting_first, bowling_first, simulate_innings(rng, overs))]
+    if kind == 'no_result':
+        # rain stopped play during the first inning
+        balls = innings[0][2]
+        cut = int(rng.integers(0, len(balls['over']) + 1))
+        innings[0] = (batting_first, bowling_first, {key: value[:cut] for key, value in balls.items()})
+    else:
+        first_total = int(np.sum(innings[0][2]['runs_off_bat'] + innings[0][2]['extras']))
+        # the chase of a tied match stops level with the first inning
+        target = first_total if kind == 'super_over' else first_total + 1
+        innings.append((bowling_first, batting_first, simulate_innings(rng, overs, target=target)))
+        second_total = int(np.sum(innings[1][2]['runs_off_bat'] + innings[1][2]['extras']))
+        # scores level after both innings are decided by a super over
+        kind = 'super_over' if second_total == first_total else kind.replace('super_over', 'complete')
+
+    if kind == 'super_over':
+        innings.append((bowling_first, batting_first, simulate_innings(rng, 1, max_wickets=2)))
+        innings.append((batting_first, bowling_first, simulate_innings(rng, 1, max_wickets=2)))
+
+    lines = [','.join(BALL_HEADER)]
+    for number, (batting, bowling, balls) in enumerate(innings, start=1):
+        lines += _ball_lines(match_id, season, start_date, venue, number, batting, bowling, balls)
+    ball_csv = '\n'.join(lines) + '\n'
+
+    info = ['version,2.1.0', 'info,balls_per_over,6', f'info,team,{team_1}', f'info,team,{team_2}',
+            'info,gender,male', f'info,season,{season}', f"info,date,{day.strftime('%Y/%m/%d')}"]
+    if rng.random() >= MISSING_EVENT_SHARE:
+        info.append(f'info,event,{EVENTS[rng.integers(len(EVENTS))]}')
+        info.append(f'info,match_number,{rng.integers(1, 6)}')
+    info += [f'info,venue,{_quote(venue)}', f'info,city,{city}',
+             f'info,toss_winner,{toss_winner}', f'info,toss_decision,{toss_decision}']
+    if kind != 'no_result':
+        info.append(f'info,player_of_match,{players(batting_first)[0]}')
+    info += ['info,umpire,Umpire One', 'info,umpire,Umpire Two', 'info,match_referee,Match Referee']
+
+    if kind == 'no_result':
+        info.append('info,outcome,no result')
+    elif kind == 'super_over':
+        info += ['info,outcome,tie', f'info,eliminator,{[team_1, team_2][rng.integers(2)]}']
+    elif second_total > first_total:
+        wickets = int(np.sum(innings[1][2]['wicket']))
+        info += [f'info,winner,{bowling_first}', f'info,winner_wickets,{10 - wickets}']
+    else:
+        info += [f'info,winner,{batting_first}', f'info,winner_runs,{first_total - second_total}']
+    if kind == 'shortened':
+        info.append('info,method,D/L')
+
+    for team in [team_1, team_2]:
+        info += [f'info,player,{team},{player}' for player in players(team)]
+    for team in [team_1, team_2]:
+        info += [f'info,registry,people,{player},{zlib.crc32(player.encode()):08x}'
+                 for player in players(team)]
+    info_csv = '\n'.join(info) + '\n'
+
+    return ball_csv, info_csv
+
+
+def write_synthetic_data(output_path, matches, seed=0, archive=False):
+    '''
+    Write a synthetic cricsheet data set
+    :param output_path: directory to write the <id>.csv and <id>_info.csv files into, or path of
+    the zip archive to write when archive is True
+    :param matches: number of matches
+    :param seed: seed of the data set
+    :param archive: write a zip archive instead of a directory
+    :return: number of files written
+    '''
+    assert isinstance(matches, int) and matches >= 0
+
+    if archive:
+        with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for match_id in range(FIRST_MATCH_ID, FIRST_MATCH_ID + matches):
+                ball_csv, info_csv = synthetic_match(match_id, seed)
+                zf.writestr(f'{match_id}.csv', ball_csv)
+                zf.writestr(f'{match_id}_info.csv', info_csv)
+    else:
+        os.makedirs(output_path, exist_ok=True)
+        for match_id in range(FIRST_MATCH_ID, FIRST_MATCH_ID + matches):
+            ball_csv, info_csv = synthetic_match(match_id, seed)
+            with open(os.path.join(output_path, f'{match_id}.csv'), 'w', newline='') as f:
+                f.write(ball_csv)
+            with open(os.path.join(output_path, f'{match_id}_info.csv'), 'w', newline='') as f:
+                f.write(info_csv)
+
+    return 2 * matches
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write a synthetic cricsheet data set')
+    parser.add_argument('output', help='directory (or .zip file) to write the data set to')
+    parser.add_argument('--matches', type=int, default=1000, help='number of matches (default: 1000)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the data set (default: 0)')
+    args = parser.parse_args()
+
+    print(write_synthetic_data(args.output, args.matches, args.seed, archive=args.output.endswith('.zip')))
@@ -8,43 +8,58 @@ import matplotlib.pyplot as plt
 from matplotlib.ticker import PercentFormatter
 import numpy as np
 
+from load_data import ensure_schema, load_database, venue_cities
+from render_cache import RenderCache
+from team_cube import TeamCube
+
+# plots saved by create_team_visualizations
+TEAM_VISUALIZATION_FILES = ["England_vs_other_teams.png", "India_vs_other_teams.png", "New_Zealand_vs_other_teams.png",
+                            "Pakistan_vs_other_teams.png", "England_performance.png", "India_performance.png",
+                            "NewZealand_performance.png", "Pakistan_performance.png"]
+
+
+def _cube_ground_totals(cube):
+    """
+    The venue totals of ground_averages from a rollup of the cube
+
+    param cube: Cube of the database ; TeamCube
+    """
+
+    totals = cube.rollup(['updated_venue', 'update_city', 'batting_first'])
+    totals['updated_city'] = venue_cities(totals['updated_venue'], totals['update_city'])
+    totals['innings_number'] = np.where(totals['batting_first'], 1, 2).astype('int8')
+    # innings without a venue or city are not grouped, like in the innings
+    totals = totals.dropna(subset=['updated_venue', 'updated_city'])
+    totals = totals.rename(columns={'innings': 'Total_Score_A_count'})
+    return totals.groupby(['updated_venue', 'updated_city', 'innings_number']).agg({
+            'Total_Score_A':'sum', 'Total_Score_A_count':'sum', 'Total_Wicket_A':'sum', 'Runs_in_Death_overs':'sum',
+            'Runs_in_middle_overs':'sum'
+    }).add_suffix('_sum').rename(columns={'Total_Score_A_count_sum': 'Total_Score_A_count'}).reset_index()
+
 
 def ground_averages(db):
     """
-    param db: Database ; pandas Dataframe
+    param db: Database ; pandas Dataframe or TeamCube, the venue averages of a cube are summed from its cells
+    and the cube is returned in place of the database
     """
 
-    assert isinstance(db, pd.DataFrame)
-    
-    # Some more cleaning
-    missing_cities = {'Harare Sports Club':'Harare',
-                    'Sylhet International Cricket Stadium':'Sylhet',
-                    'Dubai International Cricket Stadium':'Dubai',
-                    'Sydney Cricket Ground':'Sydney',
-                    'Sylhet Stadium':'Sylhet',
-                    'Pallekele International Cricket Stadium':'Kandy',
-                    'Sharjah Cricket Stadium':'Sharjah',
-                    'Melbourne Cricket Ground':'Melbourne',
-                    'Moara Vlasiei Cricket Ground':'Ilfov County',
-                    'Rawalpindi Cricket Stadium':'Rawalpindi',
-                    'Adelaide Oval':'Adelaide',
-                    'Mombasa Sports Club Ground':'Mombasa',
-                    'Carrara Oval':'Carrara'
-                    }
-
-    db['updated_city'] = db.apply(lambda x: missing_cities[x['updated_venue']] \
-                                  if str(x['updated_venue']) in missing_cities.keys() \
-                                  else x['update_city'], axis=1
-                                  )
-    
-    # Finding various averages 
-    avg_db = db.groupby(['updated_venue', 'updated_city', 'innings_number']).agg({
-            'Total_Score_A':['sum', 'count'], 'Total_Wicket_A':'sum', 'Runs_in_Death_overs':'sum',
-            'Runs_in_middle_overs':'sum' 
-    }).reset_index()
-    
-    # Renaming columns
-    avg_db.columns = [col[0] if col[1] == "" else '_'.join(col) for col in avg_db.columns.values]
+    if isinstance(db, TeamCube):
+        avg_db = _cube_ground_totals(db)
+    else:
+        assert isinstance(db, pd.DataFrame)
+
+        db = ensure_schema(db)
+        # Some more cleaning, the cities of the venues listed in DataProcessing/venue_aliases.csv
+        db['updated_city'] = venue_cities(db['updated_venue'], db['update_city'])
+
+        # Finding various averages, only observed groups of the categorical columns are kept
+        avg_db = db.groupby(['updated_venue', 'updated_city', 'innings_number'], observed=True).agg({
+                'Total_Score_A':['sum', 'count'], 'Total_Wicket_A':'sum', 'Runs_in_Death_overs':'sum',
+                'Runs_in_middle_overs':'sum'
+        }).sort_index().reset_index()
+
+        # Renaming columns
+        avg_db.columns = [col[0] if col[1] == "" else '_'.join(col) for col in avg_db.columns.values]
 
     # Creating average columns
     avg_cols = ['avg_score', 'avg_wickets', 'avg_death_over_score', 'avg_middle_over_score']
@@ -81,8 +96,8 @@ def batting_bowling_performances(avg_db, utd_db):
                          'avg_score', 'avg_wickets', 'innings_number', 
                          'team_A', 'team_B', 'Total_Score_A','Total_Wicket_A']]
     
-    first_innings = refined_db[utd_db['innings_number'].str.strip() == 'A']
-    second_innings = refined_db[utd_db['innings_number'].str.strip() == 'B']
+    first_innings = refined_db[utd_db['innings_number'] == 1]
+    second_innings = refined_db[utd_db['innings_number'] == 2]
 
     # Renaming second innings columns
     rename_second_cols = {'team_A': 'team_A2', 'team_B': 'team_B2', 
@@ -142,9 +157,9 @@ def batting_bowling_performances(avg_db, utd_db):
 
     final_list = pd.concat([list_1, list_2])
 
-    ds = final_list.groupby(['home', 'opposition', 'win_or_loss']).agg({
+    ds = final_list.groupby(['home', 'opposition', 'win_or_loss'], observed=True).agg({
             'both_perf':['count', 'sum'], 'batting_perf':'sum', \
-            'bowling_perf':'sum'}).reset_index()
+            'bowling_perf':'sum'}).sort_index().reset_index()
 
     ds.columns = [col[0] if col[1] == "" else '_'.join(col) for col in ds.columns.values]
     ds.rename(columns={ ds.columns[3]: "matchups" }, inplace = True)
@@ -451,7 +466,7 @@ def world_map_visualization(avg_db):
 
     # Filtering for stadiums where atleast 5 matches have been played
     avg_db_1 = avg_db[(avg_db['Total_Score_A_count'] >= 5) & 
-                (avg_db['innings_number'].str.strip() == 'A')
+                (avg_db['innings_number'] == 1)
                 ].sort_values(by=['avg_score','Total_Score_A_count'], 
                                 ascending=False)
     city_country_df = pd.DataFrame(city_country_mapping.items(), columns=['updated_city', 'name'])
@@ -484,10 +499,14 @@ def world_map_visualization(avg_db):
 
 
 if __name__ == "__main__":
-    BASE_PATH = os.getcwd()
-    DATABASE_PATH = os.path.join(BASE_PATH, "DataProcessing", "result_post_step.csv")
-    database = pd.read_csv(DATABASE_PATH)
+    database = load_database(columns=['match_id', 'updated_venue', 'update_city', 'innings_number',
+                                      'team_A', 'team_B', 'winner', 'Total_Score_A', 'Total_Wicket_A',
+                                      'Runs_in_Death_overs', 'Runs_in_middle_overs'])
     avg_db, uptd_db = ground_averages(database)
     final_db = batting_bowling_performances(avg_db, uptd_db)
-    create_team_visualizations(final_db)
+    # the team plots are only drawn again when the performances or this file changed
+    render_cache = RenderCache(os.getcwd(), code_files=[os.path.abspath(__file__)])
+    render_cache.render("team_visualizations", final_db, {}, lambda: create_team_visualizations(final_db),
+                        files=TEAM_VISUALIZATION_FILES)
+    render_cache.save()
     world_map_visualization(avg_db)
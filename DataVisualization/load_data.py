@@ -0,0 +1,53 @@
+import os
+import sys
+import pandas as pd
+
+# the store is written by the data processing code
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_PATH, "DataProcessing"))
+
+from canonical_names import venue_cities
+from columnar_store import STORE_NAME, load_store, pa
+from schema import INNINGS_NUMBERS, apply_schema, csv_dtypes, derive_columns, ensure_schema, source_columns
+
+DATABASE_PATH = os.path.join(BASE_PATH, "DataProcessing", "result_post_step.csv")
+STORE_PATH = os.path.join(BASE_PATH, "DataProcessing", STORE_NAME)
+
+
+def load_database(columns=None, min_year=None, max_year=None, events=None):
+    """
+    Loads the processed database, from the parquet store when it has been created
+    (python ./DataProcessing/columnar_store.py or python ./DataProcessing/pre_process_data.py --store)
+    and from result_post_step.csv otherwise.
+    Only the requested columns, years and events are loaded.
+    The data uses the compact schema of DataProcessing/schema.py: teams, venues, cities and
+    events are categorical, runs and wickets small unsigned ints, match_id an int and
+    innings_number 1 for the first and 2 for the second inning.
+    The boolean columns batting_first, won (team_A won the match) and in_australia are
+    derived once while loading and can be requested like the other columns.
+
+    param columns: columns to load; list of str; default value = all columns
+    param min_year: first year to load; int
+    param max_year: last year to load; int
+    param events: events to load; list of str
+    """
+
+    if pa is not None and os.path.isdir(STORE_PATH):
+        return load_store(STORE_PATH, columns=columns, min_year=min_year, max_year=max_year, events=events)
+
+    usecols = None
+    if columns is not None:
+        # the filter columns are needed even when they are not requested
+        usecols = source_columns(columns)
+        usecols += [col for col in ["year", "event"] if col not in usecols]
+    db = pd.read_csv(DATABASE_PATH, usecols=usecols, dtype=csv_dtypes(usecols))
+    if min_year is not None:
+        db = db[db["year"] >= min_year]
+    if max_year is not None:
+        db = db[db["year"] <= max_year]
+    if events is not None:
+        db = db[db["event"].isin(events)]
+    db = apply_schema(db.reset_index(drop=True))
+    if columns is not None:
+        db = db[columns]
+    return db
@@ -0,0 +1,123 @@
+import hashlib
+from collections import OrderedDict
+
+import pandas as pd
+
+# prepared views and team slices kept before the least recently used one is dropped
+VIEW_CACHE_SIZE = 4
+SLICE_CACHE_SIZE = 64
+
+
+def frame_fingerprint(db):
+    """
+    Hash of the contents, index and columns of a database
+
+    param db: Database ; pandas Dataframe
+    """
+
+    assert isinstance(db, pd.DataFrame)
+
+    digest = hashlib.sha1(repr(list(db.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(db, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class PreparedViews:
+    """
+    Memoized preparation of the database for the plots: the filtered and derived subset (the view)
+    of a database and the slices of single teams of it, keyed by the fingerprint of the database
+    and the filter parameters. Both are kept in LRU caches, so repeated calls for the same
+    database only aggregate.
+    The database is hashed on every call, so a database changed in place gets new views
+    """
+
+    def __init__(self, prepare, views=VIEW_CACHE_SIZE, slices=SLICE_CACHE_SIZE):
+        """
+        param prepare: Function of (db, **params) returning the view ; function
+        param views: Number of views kept; int
+        param slices: Number of team slices kept; int
+        """
+
+        assert callable(prepare)
+        assert isinstance(views, int) and views >= 1
+        assert isinstance(slices, int) and slices >= 1
+
+        self.prepare = prepare
+        self.views = views
+        self.slices = slices
+        self._views = OrderedDict()
+        self._slices = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _lookup(cache, key, size, compute):
+        # least recently used entries are at the start of the cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key], True
+        value = compute()
+        cache[key] = value
+        if len(cache) > size:
+            cache.popitem(last=False)
+        return value, False
+
+    def _count(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def view(self, db, **params):
+        """
+        Prepared view of a database
+
+        param db: Database ; pandas Dataframe
+        param params: Filter parameters passed to prepare
+        """
+
+        return self._view(db, frame_fingerprint(db), params)
+
+    def _view(self, db, fingerprint, params):
+        # view of a database whose fingerprint is known
+        key = (fingerprint, tuple(sorted(params.items())))
+        view, hit = self._lookup(self._views, key, self.views, lambda: self.prepare(db, **params))
+        self._count(hit)
+        return view
+
+    def team_slice(self, db, team_1, team_2="All", **params):
+        """
+        Innings of the prepared view batted by a team, against all teams or a single one
+
+        param db: Database ; pandas Dataframe
+        param team_1: Batting team; str
+        param team_2: Bowling team; str; default value = all
+        param params: Filter parameters passed to prepare
+        """
+
+        assert isinstance(team_1, str)
+        assert isinstance(team_2, str)
+
+        fingerprint = frame_fingerprint(db)
+
+        def compute():
+            view = self._view(db, fingerprint, params)
+            selected = view[view["team_A"] == team_1]
+            if team_2 != "All":
+                selected = selected[selected["team_B"] == team_2]
+            return selected
+
+        key = (fingerprint, tuple(sorted(params.items())), team_1, team_2)
+        selected, hit = self._lookup(self._slices, key, self.slices, compute)
+        self._count(hit)
+        return selected
+
+    def clear(self):
+        """
+        Drop all views and slices
+        """
+
+        self._views.clear()
+        self._slices.clear()
+        self.hits = 0
+        self.misses = 0
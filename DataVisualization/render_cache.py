@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+
+import matplotlib
+
+from prepared_views import frame_fingerprint
+
+# manifest of the cache, kept in the directory of the plots
+MANIFEST_NAME = "render_manifest.json"
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# code the plots of plots_1_2_3 depend on
+PLOT_CODE_FILES = [os.path.join(DIRECTORY, name) for name in ["plots_1_2_3.py", "team_aggregates.py", "team_cube.py"]]
+
+
+def file_digest(path):
+    """
+    sha1 of the contents of a file
+
+    param path: Path of the file; str
+    """
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_version(code_files=PLOT_CODE_FILES):
+    """
+    Version of the plotting code: hash of the code files and the matplotlib version
+
+    param code_files: Paths of the code the plots depend on; list of str
+    """
+
+    digest = hashlib.sha1(matplotlib.__version__.encode("utf-8"))
+    for path in code_files:
+        digest.update(file_digest(path).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    Skips renders whose plots are still valid. A render is keyed by a hash of the aggregated table it plots,
+    its parameters and the version of the plotting code, and is valid while the manifest holds the same key
+    and its files are unchanged on disk.
+    The manifest lists every render with its key and the hashes of its files, and which renders of the
+    last run were reused and which were rendered
+    """
+
+    def __init__(self, output_dir, code_files=PLOT_CODE_FILES):
+        """
+        param output_dir: Directory of the plots and the manifest; str
+        param code_files: Paths of the code the plots depend on; list of str
+        """
+
+        assert isinstance(output_dir, str)
+
+        self.output_dir = output_dir
+        self.version = code_version(code_files)
+        self.entries = {}
+        self.reused = []
+        self.rendered = []
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.entries = json.load(f).get("entries", {})
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.output_dir, MANIFEST_NAME)
+
+    def key(self, table, params):
+        """
+        Key of a render
+
+        param table: Aggregated data the render plots ; pandas Dataframe
+        param params: Parameters of the render; dict of json values
+        """
+
+        digest = hashlib.sha1(frame_fingerprint(table).encode("utf-8"))
+        digest.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+        digest.update(self.version.encode("utf-8"))
+        return digest.hexdigest()
+
+    def valid(self, name, key):
+        """
+        Whether the plots of a render are still valid
+
+        param name: Name of the render; str
+        param key: Key of the render; str
+        """
+
+        entry = self.entries.get(name)
+        if entry is None or entry["key"] != key:
+            return False
+        for file_name, digest in entry["files"].items():
+            path = os.path.join(self.output_dir, file_name)
+            if not os.path.exists(path) or file_digest(path) != digest:
+                return False
+        return True
+
+    def record(self, name, key, paths):
+        """
+        Record the plots of a finished render
+
+        param name: Name of the render; str
+        param key: Key of the render; str
+        param paths: Paths of the plots; list of str
+        """
+
+        files = {}
+        for path in paths:
+            path = os.path.join(self.output_dir, path)
+            files[os.path.relpath(path, self.output_dir)] = file_digest(path)
+        self.entries[name] = {"key": key, "files": files}
+        self.rendered.append(name)
+
+    def reuse(self, name):
+        """
+        Record that the plots of a render are reused, returns their paths
+
+        param name: Name of the render; str
+        """
+
+        self.reused.append(name)
+        return [os.path.join(self.output_dir, file_name) for file_name in self.entries[name]["files"]]
+
+    def render(self, name, table, params, render, files=None):
+        """
+        Run a render unless its plots are still valid
+
+        param name: Name of the render; str
+        param table: Aggregated data the render plots ; pandas Dataframe
+        param params: Parameters of the render; dict of json values
+        param render: Function without arguments rendering the plots and returning their paths ; function
+        param files: Paths of the plots, relative to the output directory, when render does not return them; list of str
+        returns: Paths of the plots; list of str
+        """
+
+        key = self.key(table, params)
+        if self.valid(name, key):
+            return self.reuse(name)
+        paths = render()
+        if files is not None:
+            paths = files
+        self.record(name, key, paths)
+        return [os.path.join(self.output_dir, path) for path in paths]
+
+    def save(self):
+        """
+        Write the manifest
+        """
+
+        manifest = {"code_version": self.version, "reused": self.reused, "rendered": self.rendered,
+                    "entries": self.entries}
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
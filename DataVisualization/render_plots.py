@@ -0,0 +1,154 @@
+import argparse
+import os
+import time
+from multiprocessing import Pool
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+from load_data import load_database
+from plots_1_2_3 import make_plots_1, make_plots_2, make_plots_3
+from render_cache import RenderCache
+from team_aggregates import SUPER_12, all_team_metrics
+from team_cube import load_team_cube
+
+# plot families of plots_1_2_3 rendered for every team pair
+PLOT_FUNCTIONS = {"win_loss": make_plots_1, "averages": make_plots_2, "phases": make_plots_3}
+
+# database of a worker process, set by _init_worker
+_db = None
+
+
+def team_pairs(teams=SUPER_12, against=True):
+    """
+    (team_1, team_2) pairs to render: every team against all teams and, with against, against every other team
+
+    param teams: Teams to render; list of str; default value = super 12 teams
+    param against: Also render every pair of different teams; bool; default value = True
+    """
+
+    pairs = [(team, "All") for team in teams]
+    if against:
+        pairs += [(team_1, team_2) for team_1 in teams for team_2 in teams if team_1 != team_2]
+    return pairs
+
+
+def _init_worker(db):
+    # workers render on the non-interactive backend, the database is sent once per worker
+    global _db
+    plt.switch_backend("Agg")
+    _db = db
+
+
+def _render(task):
+    # render one plot family of one team pair, the figures are closed once saved
+    name, team_1, team_2, output_dir = task
+    return PLOT_FUNCTIONS[name](_db, team_1, team_2, save_dir=output_dir, show=False)
+
+
+def _render_tasks(db, tasks, workers):
+    # paths saved by each task, in the order of the tasks
+    if workers == 1:
+        backend = matplotlib.get_backend()
+        plt.switch_backend("Agg")
+        try:
+            return [PLOT_FUNCTIONS[name](db, team_1, team_2, save_dir=output_dir, show=False)
+                    for name, team_1, team_2, output_dir in tasks]
+        finally:
+            plt.switch_backend(backend)
+
+    with Pool(workers, initializer=_init_worker, initargs=(db,)) as pool:
+        return list(pool.imap(_render, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+
+def pair_tables(db, pairs):
+    """
+    Aggregated table each team pair is plotted from, the metrics of team_metrics computed for all pairs at once
+
+    param db: Database ; pandas Dataframe or TeamCube
+    param pairs: (team_1, team_2) pairs, see team_pairs; list of tuple
+    """
+
+    tables = {}
+    for against in [False, True]:
+        metrics = all_team_metrics(db, against)
+        levels = [0, 1] if against else 0
+        for key, table in metrics.groupby(level=levels, observed=True):
+            key = key if against else (key, "All")
+            tables[key] = table.droplevel(levels)
+    # pairs which never played plot an empty table
+    empty = metrics.iloc[:0].droplevel([0, 1])
+    return {pair: tables.get(pair, empty) for pair in pairs}
+
+
+def render_plots(db, pairs, output_dir, plots=tuple(PLOT_FUNCTIONS), workers=1, cache=True):
+    """
+    Renders the plots of plots_1_2_3 for team pairs into a directory without showing them.
+    The figures are rendered on the Agg backend by a pool of worker processes and closed as soon as they are saved.
+    With the cache, plots whose aggregated data, parameters and plotting code did not change since they were
+    rendered into the directory are reused, see render_cache.py
+
+    param db: Database ; pandas Dataframe or TeamCube
+    param pairs: (team_1, team_2) pairs to render, see team_pairs; list of tuple
+    param output_dir: Directory the plots are saved in, created when missing; str
+    param plots: Plot families to render, keys of PLOT_FUNCTIONS; list of str; default value = all
+    param workers: Number of worker processes, 1 renders in this process; int
+    param cache: Skip the renders whose plots are still valid; bool; default value = True
+    returns: Paths of the saved plots; list of str
+    """
+
+    assert isinstance(output_dir, str)
+    assert isinstance(workers, int) and workers >= 1
+    assert all(name in PLOT_FUNCTIONS for name in plots)
+
+    os.makedirs(output_dir, exist_ok=True)
+    # the pairs of a team are next to each other so a worker reuses its prepared team slices
+    tasks = [(name, team_1, team_2, output_dir) for team_1, team_2 in pairs for name in plots]
+    if not cache:
+        return [path for paths in _render_tasks(db, tasks, workers) for path in paths]
+
+    render_cache = RenderCache(output_dir)
+    tables = pair_tables(db, pairs)
+    saved = []
+    stale = []
+    for task in tasks:
+        name, team_1, team_2, _ = task
+        render_name = f"{name}_{team_1}_{team_2}"
+        key = render_cache.key(tables[(team_1, team_2)], {"plot": name, "team_1": team_1, "team_2": team_2})
+        if render_cache.valid(render_name, key):
+            saved += render_cache.reuse(render_name)
+        else:
+            stale.append((task, render_name, key))
+
+    rendered = _render_tasks(db, [task for task, _, _ in stale], workers) if stale else []
+    for (_, render_name, key), paths in zip(stale, rendered):
+        render_cache.record(render_name, key, paths)
+        saved += paths
+    render_cache.save()
+    print(f"Rendered {len(render_cache.rendered)} and reused {len(render_cache.reused)} of {len(tasks)} plot sets")
+    return saved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the plots of plots_1_2_3 for many team pairs without a display")
+    parser.add_argument("--output", default=os.path.join(os.getcwd(), "DataVisualization", "plots"),
+                        help="directory to save the plots in (default: DataVisualization/plots)")
+    parser.add_argument("--teams", nargs="+", default=SUPER_12,
+                        help="teams to render (default: the super 12 teams of the T20WC 2022)")
+    parser.add_argument("--against", action="store_true",
+                        help="also render every team against every other team, not only against all teams")
+    parser.add_argument("--plots", nargs="+", default=list(PLOT_FUNCTIONS), choices=list(PLOT_FUNCTIONS),
+                        help="plot families to render (default: all)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: number of cpus)")
+    parser.add_argument("--cube", action="store_true",
+                        help="compute the plots from the team cube of the database instead of the innings")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="render every plot, also the ones whose data did not change")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    database = load_team_cube() if args.cube else load_database(min_year=2016)
+    saved = render_plots(database, team_pairs(args.teams, args.against), args.output, args.plots, args.workers,
+                         cache=not args.no_cache)
+    print(f"Saved {len(saved)} plots to {args.output} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,206 @@
+import argparse
+import json
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+from ground_averages import ground_averages
+from load_data import load_database
+from team_aggregates import PHASES, SCENARIOS, team_metrics
+from team_cube import TeamCube, load_team_cube
+from wc_stats import average_inng_total, seperate_wc, win_loss_inn_wise, win_loss_table
+
+# query results kept before the least recently used one is dropped
+RESULT_CACHE_SIZE = 256
+
+DEFAULT_PORT = 8143
+
+# columns of team_metrics answered by each team query, the names of make_plots_1/2/3
+TEAM_QUERIES = {
+    "win_loss": {f"win_{scenario}": f"win_{scenario}" for scenario in SCENARIOS},
+    "averages": {f"{metric}_{scenario}": f"{metric}_{scenario}" for scenario in SCENARIOS
+                 for metric in ["score", "wickets"]},
+    "phases": {f"avg_{metric}_{phase}_{scenario}": f"{column}_{phase}_{scenario}" for scenario in SCENARIOS
+               for phase, _, _, _ in PHASES for metric, column in [("score", "runrate"), ("wickets", "wickets")]},
+}
+
+
+def _records(frame):
+    # json values of a dataframe, one object per row
+    return json.loads(frame.to_json(orient="records"))
+
+
+class StatsService:
+    """
+    Answers the questions of the plotting functions as json: the team metrics of make_plots_1/2/3, the ground
+    averages and the world cup tables. The data is loaded once and the answers of the queries are kept in
+    an LRU cache, so repeated queries are served without touching pandas
+    """
+
+    def __init__(self, cube, wc_df, cache_size=RESULT_CACHE_SIZE):
+        """
+        param cube: Cube of the database ; TeamCube
+        param wc_df: Innings of the world cup matches, see seperate_wc ; pandas Dataframe
+        param cache_size: Number of query results kept; int
+        """
+
+        assert isinstance(cube, TeamCube)
+        assert isinstance(wc_df, pd.DataFrame)
+        assert isinstance(cache_size, int) and cache_size >= 1
+
+        self.cube = cube
+        self.wc_df = wc_df
+        self.wc_cube = TeamCube.from_database(wc_df)
+        self.queries = {"win_loss": self.win_loss, "averages": self.averages, "phases": self.phases,
+                        "ground_averages": self.ground_averages, "world_cup": self.world_cup}
+        # the cache belongs to the service, its keys are the query and its sorted parameters
+        self.answer = lru_cache(maxsize=cache_size)(self._answer)
+
+    @classmethod
+    def from_database(cls, cache_size=RESULT_CACHE_SIZE):
+        """
+        Service over the processed database, see load_database and load_team_cube
+
+        param cache_size: Number of query results kept; int
+        """
+
+        wc_df = seperate_wc(load_database(min_year=2022, max_year=2022, events=["ICC Men's T20 World Cup"]))
+        return cls(load_team_cube(), wc_df, cache_size)
+
+    def _team(self, query, team_1, team_2="All"):
+        # metrics of a team by year with the columns of the query
+        metrics = team_metrics(self.cube, team_1, team_2)
+        columns = TEAM_QUERIES[query]
+        answer = metrics[list(columns.values())].set_axis(list(columns), axis=1)
+        answer.insert(0, "matches", metrics["matches_overall"])
+        return {"team_1": team_1, "team_2": team_2, "years": _records(answer.rename_axis("year").reset_index())}
+
+    def win_loss(self, team_1, team_2="All"):
+        """
+        Win % of a team by year, overall, batting first and batting second (make_plots_1)
+        """
+        return self._team("win_loss", team_1, team_2)
+
+    def averages(self, team_1, team_2="All"):
+        """
+        Average runs scored and wickets lost of a team by year (make_plots_2)
+        """
+        return self._team("averages", team_1, team_2)
+
+    def phases(self, team_1, team_2="All"):
+        """
+        Run rate and wickets lost in each phase of a team by year (make_plots_3)
+        """
+        return self._team("phases", team_1, team_2)
+
+    def ground_averages(self, min_matches="0", innings_number=None):
+        """
+        Average scores and wickets of every venue and inning (ground_averages)
+        """
+        avg_db, _ = ground_averages(self.cube)
+        avg_db = avg_db[avg_db["Total_Score_A_count"] >= int(min_matches)]
+        if innings_number is not None:
+            avg_db = avg_db[avg_db["innings_number"] == int(innings_number)]
+        return {"venues": _records(avg_db)}
+
+    def world_cup(self):
+        """
+        Win loss, innings wise win loss and average innings scores of the teams at the world cup (wc_stats)
+        """
+        batting_first, bowling_first = win_loss_inn_wise(self.wc_cube)
+        scores = pd.concat([average_inng_total(self.wc_cube, "A"), average_inng_total(self.wc_cube, "B")],
+                           ignore_index=True)
+        return {"win_loss": _records(win_loss_table(self.wc_cube)), "batting_first": _records(batting_first),
+                "bowling_first": _records(bowling_first), "average_scores": _records(scores)}
+
+    def _answer(self, query, params):
+        # json text of a query, params is a sorted tuple of (name, value) pairs
+        return json.dumps(self.queries[query](**dict(params)))
+
+    def query(self, query, params):
+        """
+        Answer of a query
+
+        param query: Name of the query, a key of queries; str
+        param params: Parameters of the query; dict of str
+        returns: json text; str
+        """
+
+        if query not in self.queries:
+            raise KeyError(query)
+        return self.answer(query, tuple(sorted(params.items())))
+
+
+class StatsHandler(BaseHTTPRequestHandler):
+    """
+    GET /<query>?<parameters>, eg. /win_loss?team_1=India&team_2=England
+    """
+
+    service = None
+
+    def _send(self, status, body):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = url.path.strip("/")
+        if query == "":
+            self._send(200, json.dumps({"queries": list(self.service.queries)}))
+            return
+        if query not in self.service.queries:
+            self._send(404, json.dumps({"error": f"unknown query {query}", "queries": list(self.service.queries)}))
+            return
+        try:
+            self._send(200, self.service.query(query, dict(parse_qsl(url.query))))
+        except (TypeError, ValueError) as e:
+            self._send(400, json.dumps({"error": str(e)}))
+
+    def log_message(self, format, *args):
+        # requests are not logged
+        return
+
+
+class StatsServer(ThreadingHTTPServer):
+    # dashboards open many connections at once, the default backlog of 5 makes them wait for retries
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def serve(service, host="127.0.0.1", port=DEFAULT_PORT):
+    """
+    Serves the queries of a service over http until interrupted, every request is handled in its own thread
+
+    param service: Service answering the queries ; StatsService
+    param host: Address to listen on; str
+    param port: Port to listen on; int
+    """
+
+    handler = type("Handler", (StatsHandler,), {"service": service})
+    with StatsServer((host, port), handler) as server:
+        print(f"Serving {', '.join(service.queries)} on http://{host}:{server.server_port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the statistics of the processed database as json")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--cache-size", type=int, default=RESULT_CACHE_SIZE,
+                        help=f"number of query results kept (default: {RESULT_CACHE_SIZE})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats_service = StatsService.from_database(args.cache_size)
+    print(f"Loaded the data in {time.perf_counter() - start:.1f}s")
+    serve(stats_service, args.host, args.port)
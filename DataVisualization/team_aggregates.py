@@ -0,0 +1,171 @@
+import pandas as pd
+import numpy as np
+
+from load_data import derive_columns
+from prepared_views import PreparedViews
+from team_cube import TeamCube
+
+# teams of the super 12 stage of the T20WC 2022
+SUPER_12 = ["India", "Australia", "England", "Pakistan", "South Africa", "Bangladesh", "Afghanistan", "Sri Lanka", "Ireland", "Zimbabwe", "Netherlands", "New Zealand"]
+
+# (name, runs column, wickets column, overs) of the powerplay, middle and death overs
+PHASES = [("P", "Runs_in_Powerplay", "Wickets_lost_in_Powerplay", 6),
+          ("M", "Runs_in_middle_overs", "Wickets_lost_in_middle_overs", 10),
+          ("D", "Runs_in_Death_overs", "Wickets_lost_in_death_overs", 4)]
+
+# matches of all innings, of the innings batting first and of the innings batting second
+SCENARIOS = ["overall", "bat", "ball"]
+
+# columns summed for every (year, batting_first) cell
+SUM_COLUMNS = ["won", "Total_Score_A", "Total_Wicket_A"] + [column for phase in PHASES for column in phase[1:3]]
+
+
+def reference_data(db, teams=tuple(SUPER_12), min_year=2016):
+    """
+    Innings of the super 12 teams since 2016 with the batting_first and won columns used by the aggregates,
+    they are derived here when the database was not loaded with them
+
+    param db: Database ; pandas Dataframe
+    param teams: Batting teams kept; tuple of str; default value = super 12 teams
+    param min_year: First year kept; int; default value = 2016
+    """
+
+    assert isinstance(db, pd.DataFrame)
+    assert isinstance(min_year, int)
+
+    ref_db = db[db["team_A"].isin(list(teams)) & (db["year"] >= min_year)]
+    if "batting_first" in ref_db.columns and "won" in ref_db.columns:
+        return ref_db
+    return derive_columns(ref_db.copy())
+
+
+# reference data and team slices shared by all calls, see prepared_views.py
+VIEWS = PreparedViews(reference_data)
+
+
+def _ratio(numerator, denominator):
+    # rounded ratio of two arrays, 0 where there are no matches
+    return np.where(denominator > 0, np.round(numerator / np.maximum(denominator, 1), 2), 0.0)
+
+
+def aggregate(ref_db, keys=None):
+    """
+    All metrics of make_plots_1/2/3 from a single grouped reduction over (keys, year, batting_first):
+    number of matches, win %, average score and wickets and the run rate and wickets of each phase,
+    for the matches batting first (bat), batting second (ball) and all matches (overall).
+    Cells without matches hold 0
+
+    param ref_db: Innings from reference_data ; pandas Dataframe
+    param keys: Columns to aggregate separately, eg. ["team_A"] for all teams at once; list of str; default value = none
+    """
+
+    assert isinstance(ref_db, pd.DataFrame)
+    keys = list(keys) if keys is not None else []
+
+    group = keys + ["year", "batting_first"]
+    grouped = ref_db[group + SUM_COLUMNS].groupby(group, observed=True)
+    # the groups of categorical keys are not sorted
+    totals = grouped.sum().assign(matches=grouped.size()).sort_index()
+    cells = {dim: totals.index.get_level_values(dim) for dim in keys + ["year"]}
+    sums = totals.to_numpy(dtype=np.int64)
+    return _metrics(cells, totals.index.get_level_values("batting_first").to_numpy(dtype=bool), sums)
+
+
+def cube_aggregate(cube, keys=None, teams=tuple(SUPER_12), min_year=2016, **filters):
+    """
+    The metrics of aggregate from a rollup of a TeamCube instead of the innings
+
+    param cube: Cube of the database ; TeamCube
+    param keys: Dimensions to aggregate separately, eg. ["team_A"] for all teams at once; list of str; default value = none
+    param teams: Batting teams kept; tuple of str; default value = super 12 teams
+    param min_year: First year kept; int; default value = 2016
+    param filters: Further filters of TeamCube.rollup, eg. team_B="England"
+    """
+
+    assert isinstance(cube, TeamCube)
+    keys = list(keys) if keys is not None else []
+
+    group = keys + ["year", "batting_first"]
+    # the batting teams are the teams of the filter which are among teams
+    selected = filters.get("team_A", list(teams))
+    selected = selected if isinstance(selected, (list, tuple, set)) else [selected]
+    filters["team_A"] = [team for team in selected if team in teams]
+    totals = cube.rollup(group, min_year=min_year, **filters)
+    cells = {dim: totals[dim].to_numpy() for dim in keys + ["year"]}
+    sums = np.column_stack([totals[column].to_numpy() for column in SUM_COLUMNS + ["innings"]])
+    return _metrics(cells, totals["batting_first"].to_numpy(dtype=bool), sums)
+
+
+def _metrics(cells, batting_first, sums):
+    # metrics of aggregate from the sums of every (keys, year, batting_first) group, the groups are sorted
+    # cells: keys and year of every group; dict of str -> array
+    # batting_first: batting_first of every group; bool array
+    # sums: SUM_COLUMNS and the number of matches of every group; int array
+    columns = SUM_COLUMNS + ["matches"]
+
+    # the groups of a (keys, year) cell are next to each other, batting first and second go to the row of the
+    # cell, missing cells are empty
+    new_cell = np.zeros(len(batting_first), dtype=bool)
+    new_cell[:1] = True
+    for values in cells.values():
+        values = np.asarray(values)
+        new_cell[1:] |= values[1:] != values[:-1]
+    totals = np.zeros((int(new_cell.sum()), 2, len(columns)), dtype=np.int64)
+    totals[np.cumsum(new_cell) - 1, np.where(batting_first, 0, 1)] = sums
+    levels = [values[new_cell] for values in cells.values()]
+    if len(levels) == 1:
+        index = pd.Index(levels[0], name=list(cells)[0])
+    else:
+        index = pd.MultiIndex.from_arrays(levels, names=list(cells)).remove_unused_levels()
+
+    # sums of every column batting first, batting second and overall
+    scenarios = {"bat": totals[:, 0], "ball": totals[:, 1]}
+    scenarios["overall"] = scenarios["bat"] + scenarios["ball"]
+    position = {column: i for i, column in enumerate(columns)}
+
+    metrics = {}
+    for scenario in SCENARIOS:
+        sums = scenarios[scenario]
+        matches = sums[:, position["matches"]]
+        metrics["matches_" + scenario] = matches
+        metrics["win_" + scenario] = _ratio(100 * sums[:, position["won"]], matches)
+        metrics["score_" + scenario] = _ratio(sums[:, position["Total_Score_A"]], matches)
+        metrics["wickets_" + scenario] = _ratio(sums[:, position["Total_Wicket_A"]], matches)
+        for name, runs, wickets, overs in PHASES:
+            metrics[f"runrate_{name}_{scenario}"] = _ratio(sums[:, position[runs]], overs * matches)
+            metrics[f"wickets_{name}_{scenario}"] = _ratio(sums[:, position[wickets]], matches)
+    return pd.DataFrame(metrics, index=index)
+
+
+def team_metrics(db, team_1, team_2="All"):
+    """
+    Metrics of aggregate for a team, by year. The team's innings come from the shared VIEWS cache,
+    or from a rollup when db is a TeamCube
+
+    param db: Database ; pandas Dataframe or TeamCube
+    param team_1: Team for which the metrics are computed; str
+    param team_2: Team against which the metrics are computed; str; default value = all
+    """
+
+    assert isinstance(team_1, str)
+    assert isinstance(team_2, str)
+
+    if isinstance(db, TeamCube):
+        if team_2 != "All":
+            return cube_aggregate(db, team_A=team_1, team_B=team_2)
+        return cube_aggregate(db, team_A=team_1)
+    return aggregate(VIEWS.team_slice(db, team_1, team_2))
+
+
+def all_team_metrics(db, against=False):
+    """
+    Metrics of aggregate for every super 12 team at once, by team and year
+
+    param db: Database ; pandas Dataframe or TeamCube
+    param against: Also separate the metrics by the opposing team; bool; default value = False
+    """
+
+    keys = ["team_A", "team_B"] if against else ["team_A"]
+    if isinstance(db, TeamCube):
+        return cube_aggregate(db, keys)
+    return aggregate(VIEWS.view(db), keys)
@@ -0,0 +1,165 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from load_data import BASE_PATH, DATABASE_PATH, STORE_PATH, derive_columns, load_database
+
+# grain of the cube: batting team, bowling team, year, first or second inning, venue, city and event
+DIMENSIONS = ["team_A", "team_B", "year", "batting_first", "updated_venue", "update_city", "event"]
+
+# additive measures of a cell, innings is the number of innings of the cell, won and lost count the innings
+# of matches the batting team won and lost (no result matches count to neither)
+MEASURES = ["innings", "won", "lost", "Total_Score_A", "Total_Wicket_A",
+            "Runs_in_Powerplay", "Wickets_lost_in_Powerplay", "Runs_in_middle_overs", "Wickets_lost_in_middle_overs",
+            "Runs_in_Death_overs", "Wickets_lost_in_death_overs"]
+
+CUBE_PATH = os.path.join(BASE_PATH, "DataProcessing", "result_post_step_cube.pkl")
+
+
+class TeamCube:
+    """
+    Materialized sums of the innings table at (team, opponent, year, batting_first, venue, city, event) grain.
+    Every cell holds the additive MEASURES of its innings, so any slice of the data is answered by summing
+    the cells of the slice with rollup instead of grouping the innings again.
+    The dimensions are kept as codes into sorted categories, missing values are the category None
+    """
+
+    def __init__(self, codes, categories, measures):
+        """
+        param codes: Code of every cell for each dimension; dict of str -> numpy array
+        param categories: Values of each dimension; dict of str -> numpy array
+        param measures: Value of every cell for each measure; dict of str -> numpy array
+        """
+
+        self.codes = codes
+        self.categories = categories
+        self.measures = measures
+        # category -> code of each dimension, to translate filters
+        self._lookup = {dim: {value: code for code, value in enumerate(values)} for dim, values in categories.items()}
+
+    @classmethod
+    def from_database(cls, db):
+        """
+        Builds the cube from the innings table in a single grouped reduction
+
+        param db: Database with the innings measures ; pandas Dataframe, dimensions which are not loaded
+                  only have the category None
+        """
+
+        assert isinstance(db, pd.DataFrame)
+
+        db = derive_columns(db.copy())
+        for dim in DIMENSIONS:
+            if dim not in db.columns:
+                db[dim] = None
+        codes = []
+        categories = {}
+        for dim in DIMENSIONS:
+            dim_codes, values = pd.factorize(db[dim], sort=True)
+            values = np.asarray(values, dtype=object if values.dtype.kind not in "biu" else values.dtype)
+            if (dim_codes < 0).any():
+                # missing values are the last category
+                dim_codes = np.where(dim_codes < 0, len(values), dim_codes)
+                values = np.append(values.astype(object), None)
+            codes.append(dim_codes)
+            categories[dim] = values
+
+        # the cells are the distinct combinations of the dimension codes
+        shape = [len(categories[dim]) for dim in DIMENSIONS]
+        cells, cell_of_innings = np.unique(np.ravel_multi_index(codes, shape), return_inverse=True)
+        cell_codes = dict(zip(DIMENSIONS, np.unravel_index(cells, shape)))
+
+        values = {"innings": np.ones(len(db), dtype=np.int64),
+                  "won": db["won"].to_numpy(),
+                  "lost": (db["team_B"].astype(object) == db["winner"].astype(object)).to_numpy()}
+        measures = {}
+        for measure in MEASURES:
+            column = values[measure] if measure in values else db[measure].to_numpy()
+            measures[measure] = np.bincount(cell_of_innings, weights=column, minlength=len(cells)).astype(np.int64)
+        return cls(cell_codes, categories, measures)
+
+    def __len__(self):
+        return len(self.measures["innings"])
+
+    def _mask(self, filters, min_year, max_year):
+        # cells matching the filters
+        mask = np.ones(len(self), dtype=bool)
+        for dim, value in filters.items():
+            assert dim in DIMENSIONS, f"{dim} is not a dimension of the cube"
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            wanted = np.zeros(len(self.categories[dim]), dtype=bool)
+            wanted[[self._lookup[dim][v] for v in values if v in self._lookup[dim]]] = True
+            mask &= wanted[self.codes[dim]]
+        years = self.categories["year"]
+        if min_year is not None:
+            mask &= (years >= min_year)[self.codes["year"]]
+        if max_year is not None:
+            mask &= (years <= max_year)[self.codes["year"]]
+        return mask
+
+    def rollup(self, by=(), min_year=None, max_year=None, **filters):
+        """
+        Sums of the measures of a slice of the cube, eg. India against all teams since 2016 batting second:
+        cube.rollup(["year"], min_year=2016, team_A="India", batting_first=False)
+
+        param by: Dimensions to keep, the other dimensions are summed up; list of str; default value = none
+        param min_year: First year of the slice; int
+        param max_year: Last year of the slice; int
+        param filters: Value or list of values of a dimension to keep, eg. team_B=["India", "England"]
+        returns: Dataframe with the by columns, sorted by them, and the MEASURES columns ; pandas Dataframe
+        """
+
+        by = list(by)
+        assert all(dim in DIMENSIONS for dim in by)
+
+        mask = self._mask(filters, min_year, max_year)
+        if not by:
+            return pd.DataFrame({measure: [int(values[mask].sum())] for measure, values in self.measures.items()})
+
+        shape = [len(self.categories[dim]) for dim in by]
+        groups, group_of_cell = np.unique(np.ravel_multi_index([self.codes[dim][mask] for dim in by], shape),
+                                          return_inverse=True)
+        columns = {dim: self.categories[dim][codes] for dim, codes in zip(by, np.unravel_index(groups, shape))}
+        for measure, values in self.measures.items():
+            columns[measure] = np.bincount(group_of_cell, weights=values[mask], minlength=len(groups)).astype(np.int64)
+        return pd.DataFrame(columns)
+
+    def save(self, path):
+        """
+        Writes the cube to a file, the file is replaced atomically
+
+        param path: Path of the cube file; str
+        """
+
+        tmp_path = path + ".tmp"
+        pd.to_pickle({"codes": self.codes, "categories": self.categories, "measures": self.measures}, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a cube written by save
+
+        param path: Path of the cube file; str
+        """
+
+        data = pd.read_pickle(path)
+        return cls(data["codes"], data["categories"], data["measures"])
+
+
+def load_team_cube(path=CUBE_PATH):
+    """
+    Loads the cube of the processed database, it is built and saved when it is missing or older than the database
+
+    param path: Path of the cube file; str; default value = next to the database
+    """
+
+    sources = [source for source in [DATABASE_PATH, STORE_PATH] if os.path.exists(source)]
+    newest = max([os.path.getmtime(source) for source in sources], default=0)
+    if os.path.exists(path) and os.path.getmtime(path) >= newest:
+        return TeamCube.load(path)
+    cube = TeamCube.from_database(load_database(columns=[column for column in DIMENSIONS + MEASURES + ["winner"]
+                                                         if column not in ["innings", "lost"]]))
+    cube.save(path)
+    return cube
@@ -1,15 +1,17 @@
 import pandas as pd
-import os
 import seaborn as sns
 import numpy as np
 
 import matplotlib.pyplot as plt
 
+from load_data import INNINGS_NUMBERS, ensure_schema, load_database
+from team_cube import TeamCube
+
 def seperate_wc(df:pd.DataFrame):
     """
     Function to seperate the world cup matches from complete dataset
     :params:
-        - df: complete datafram
+        - df: complete datafram, from load_database or read from the csv file
     
     :returns:
         Dataframe that only has information about matches played during this year's world cup
@@ -17,26 +19,35 @@ def seperate_wc(df:pd.DataFrame):
 
     assert isinstance(df, pd.DataFrame)
 
-    wc_df = df[(df['event'] == "ICC Men's T20 World Cup") & (df['year'] == 2022) & (df['id'] >= '1298147A')].reset_index()
+    df = ensure_schema(df)
+    wc_df = df[(df['event'] == "ICC Men's T20 World Cup") & (df['year'] == 2022) & (df['match_id'] >= 1298147)].reset_index()
     return wc_df
 
 def average_inng_total(df, innings_number='A'):
     """
     function to find the average innings score for all the teams
     :param:
-        - df: complete datafram
+        - df: complete datafram, or the TeamCube of the world cup matches
         - innings_number: "A" for first innings and "B" for second innings
     
     :returns:
         Dataframe with average 1st/2nd innings score for each team
     """
 
-    assert isinstance(df, pd.DataFrame)
     assert (innings_number == "A") or (innings_number == "B")
-    innings_scores = df[df['innings_number'] == innings_number]
-    innings_scores = innings_scores[['team_A', 'Total_Score_A']]
-    avg_inn_score = innings_scores.groupby('team_A').mean().reset_index()
+    if isinstance(df, TeamCube):
+        sums = df.rollup(['team_A'], batting_first=(innings_number == "A"))
+        avg_inn_score = pd.DataFrame({'team_A': sums['team_A'], 'Total_Score_A': sums['Total_Score_A'] / sums['innings']})
+    else:
+        assert isinstance(df, pd.DataFrame)
+        df = ensure_schema(df)
+        innings_scores = df[df['innings_number'] == INNINGS_NUMBERS[innings_number]]
+        innings_scores = innings_scores[['team_A', 'Total_Score_A']]
+        # only the teams which played are grouped, sort_index keeps them in alphabetical order
+        avg_inn_score = innings_scores.groupby('team_A', observed=True).mean().sort_index().reset_index()
     avg_inn_score.rename(columns={"team_A": "Team Name"}, inplace=True)
+    # only the teams which played are plotted
+    avg_inn_score["Team Name"] = avg_inn_score["Team Name"].astype(str)
     # avg_inn_score = avg_inn_score.sort_values(by="Total_Score_A", axis=0, ascending=False)
     if innings_number == "A":
         avg_inn_score['innings_number'] = "First"
@@ -87,49 +98,93 @@ def win_loss_inn_wise(wc_df):
     """
     function to find the win loss percentage (segregated by innings) for all teams for matches during the world cup
     :param:
-        - wc_df: dataframe having matches from world cup only
+        - wc_df: dataframe having matches from world cup only, or its TeamCube
     
     :returns:
         2 Dataframes (one for batting first and one for bowling first) 
         with team Name, win percent, number of wins and total matches played colunms
     """
 
+    if isinstance(wc_df, TeamCube):
+        return _cube_win_loss_inn_wise(wc_df)
     assert isinstance(wc_df, pd.DataFrame)
 
-    batting_first_wins = wc_df[(wc_df['innings_number'] == 'A') & (wc_df['team_A'] == wc_df['winner'])]
-    batting_first_wins_team_wise = batting_first_wins[['team_A', 'id']].groupby('team_A').count().reset_index()
-    total_batting_first = wc_df[(wc_df['innings_number'] == 'A')]
-    total_batting_first_team_wise = total_batting_first[['team_A', 'id']].groupby('team_A').count().reset_index()
+    wc_df = ensure_schema(wc_df)
+    batting_first_wins = wc_df[(wc_df['innings_number'] == 1) & (wc_df['team_A'] == wc_df['winner'])]
+    batting_first_wins_team_wise = batting_first_wins[['team_A', 'match_id']].groupby('team_A', observed=True).count().sort_index().reset_index()
+    total_batting_first = wc_df[(wc_df['innings_number'] == 1)]
+    total_batting_first_team_wise = total_batting_first[['team_A', 'match_id']].groupby('team_A', observed=True).count().sort_index().reset_index()
     merged_data = pd.merge(left = batting_first_wins_team_wise, right=total_batting_first_team_wise, how="outer", on="team_A")
-    merged_data['win_percent'] = merged_data['id_x'] / merged_data['id_y']
+    merged_data['win_percent'] = merged_data['match_id_x'] / merged_data['match_id_y']
     
-    bowling_first_wins = wc_df[(wc_df['innings_number'] == 'A') & (wc_df['team_B'] == wc_df['winner'])]
-    bowling_first_wins_team_wise = bowling_first_wins[['team_B', 'id']].groupby('team_B').count().reset_index()
-    total_bowling_first = wc_df[(wc_df['innings_number'] == 'A')]
-    total_bowling_first_team_wise = total_bowling_first[['team_B', 'id']].groupby('team_B').count().reset_index()
+    bowling_first_wins = wc_df[(wc_df['innings_number'] == 1) & (wc_df['team_B'] == wc_df['winner'])]
+    bowling_first_wins_team_wise = bowling_first_wins[['team_B', 'match_id']].groupby('team_B', observed=True).count().sort_index().reset_index()
+    total_bowling_first = wc_df[(wc_df['innings_number'] == 1)]
+    total_bowling_first_team_wise = total_bowling_first[['team_B', 'match_id']].groupby('team_B', observed=True).count().sort_index().reset_index()
     merged_data2 = pd.merge(left = bowling_first_wins_team_wise, right=total_bowling_first_team_wise, how="outer", on="team_B")
-    merged_data2['win_percent'] = merged_data2['id_x'] / merged_data2['id_y']
+    merged_data2['win_percent'] = merged_data2['match_id_x'] / merged_data2['match_id_y']
     return merged_data, merged_data2
 
 
-def win_loss_compare(wc_df):
+def _cube_win_loss_inn_wise(wc_cube):
     """
-    function to find the win loss percentage for all teams for matches during the world cup
+    win_loss_inn_wise from rollups of the cube of the world cup matches
+    """
+
+    frames = []
+    for team, wins in [('team_A', 'won'), ('team_B', 'lost')]:
+        # wins of the team batting first and of the team bowling first
+        sums = wc_cube.rollup([team], batting_first=True)
+        won = sums[sums[wins] > 0]
+        won = pd.DataFrame({team: won[team], 'match_id': won[wins]})
+        total = pd.DataFrame({team: sums[team], 'match_id': sums['innings']})
+        merged = pd.merge(left=won, right=total, how="outer", on=team)
+        merged['win_percent'] = merged['match_id_x'] / merged['match_id_y']
+        frames.append(merged)
+    return frames[0], frames[1]
+
+
+def win_loss_table(wc_df):
+    """
+    function to find the win loss percentage for all teams for matches during the world cup, without plotting it
     :param:
-        - wc_df: dataframe having matches from world cup only
+        - wc_df: dataframe having matches from world cup only, or its TeamCube
     
     :returns:
-        Dataframe with team Name, win percent, number of wins and total matches played colunms
+        Dataframe with team Name, number of wins (teamA_winner_x), total matches played (teamA_winner_y)
+        and win percent colunms, sorted by the number of wins
     """
 
-    assert isinstance(wc_df, pd.DataFrame)
+    if isinstance(wc_df, TeamCube):
+        sums = wc_df.rollup(['team_A'])
+        wins = pd.DataFrame({'team_A': sums['team_A'], 'teamA_winner': sums['won']})
+        total = pd.DataFrame({'team_A': sums['team_A'], 'teamA_winner': sums['innings']})
+    else:
+        assert isinstance(wc_df, pd.DataFrame)
 
-    wc_df['teamA_winner'] = (wc_df['team_A'] == wc_df['winner'])
-    wins = wc_df[['team_A', 'teamA_winner']].groupby('team_A').sum().reset_index()
-    total = wc_df[['team_A', 'teamA_winner']].groupby('team_A').count().reset_index()
+        wc_df = ensure_schema(wc_df)
+        wc_df['teamA_winner'] = (wc_df['team_A'] == wc_df['winner'])
+        wins = wc_df[['team_A', 'teamA_winner']].groupby('team_A', observed=True).sum().sort_index().reset_index()
+        total = wc_df[['team_A', 'teamA_winner']].groupby('team_A', observed=True).count().sort_index().reset_index()
     merged_df = pd.merge(left=wins, right=total, how='inner', on='team_A')
+    # only the teams which played are plotted
+    merged_df['team_A'] = merged_df['team_A'].astype(str)
     merged_df = merged_df.sort_values(by="teamA_winner_x", axis=0, ascending=False, ignore_index=True)
     merged_df['win_percent'] = merged_df['teamA_winner_x'] / merged_df['teamA_winner_y']
+    return merged_df
+
+
+def win_loss_compare(wc_df):
+    """
+    function to find the win loss percentage for all teams for matches during the world cup
+    :param:
+        - wc_df: dataframe having matches from world cup only, or its TeamCube
+    
+    :returns:
+        Dataframe with team Name, win percent, number of wins and total matches played colunms
+    """
+
+    merged_df = win_loss_table(wc_df)
 
     f, ax = plt.subplots(figsize=(12, 6))
     sns.set_color_codes("pastel")
@@ -147,11 +202,12 @@ def win_loss_compare(wc_df):
     # SAVE_PATH = os.path.join(os.getcwd(), 'DataVisualization', 'plots', 'wc_win_loss.png')
     # plt.show()
     # plt.savefig("wc_win_loss.png")
+    return merged_df
 
 if __name__ == "__main__":
-    BASE_PATH = os.getcwd()
-    DATABASE_PATH = os.path.join(BASE_PATH, "DataProcessing", "result_post_step.csv")
-    df = pd.read_csv(DATABASE_PATH)
+    df = load_database(columns=['match_id', 'year', 'event', 'innings_number', 'team_A', 'team_B',
+                                'Total_Score_A', 'winner'],
+                       min_year=2022, max_year=2022, events=["ICC Men's T20 World Cup"])
     wc_df = seperate_wc(df)
     avg_inn1_score = average_inng_total(wc_df, 'A')
     avg_inn2_score = average_inng_total(wc_df, 'B')
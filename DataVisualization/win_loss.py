@@ -1,29 +1,38 @@
-import os
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+from load_data import load_database
+from team_cube import TeamCube
+
 def winloss(full_data: pd.DataFrame):
     """
     function to extract useful data for win-loss record and create corresponding visualization 
     :params:
-        - full_data: complete database
+        - full_data: complete database, or its TeamCube
     
     :returns:
         plots win-loss percentage for all countries from 2016 sorted by win percent
 
     """
-    assert isinstance(full_data, pd.DataFrame)
-
-    data = full_data[['year', 'team_A', 'team_B', 'winner', 'toss_winner', 'toss_decision']]
-    data = data[data['year'] >= 2016]
     wc_countries = ["New Zealand","England","Australia","Sri Lanka","Ireland","Afghanistan","India","Pakistan","South Africa","Netherlands","Bangladesh","Zimbabwe"]
     win_loss_records = []
-    for country in wc_countries:
-        country_data = data.loc[(data['team_A'] == country)]
-        num_wins = sum(country_data['winner'] == country)
-        total_matches = country_data['winner'].size
-        win_loss_records.append((total_matches, num_wins, country))
+    if isinstance(full_data, TeamCube):
+        # matches and wins of every country from a single rollup
+        sums = full_data.rollup(['team_A'], min_year=2016, team_A=wc_countries).set_index('team_A')
+        for country in wc_countries:
+            total_matches, num_wins = sums.loc[country, ['innings', 'won']] if country in sums.index else (0, 0)
+            win_loss_records.append((int(total_matches), int(num_wins), country))
+    else:
+        assert isinstance(full_data, pd.DataFrame)
+
+        data = full_data[['year', 'team_A', 'team_B', 'winner', 'toss_winner', 'toss_decision']]
+        data = data[data['year'] >= 2016]
+        for country in wc_countries:
+            country_data = data.loc[(data['team_A'] == country)]
+            num_wins = sum(country_data['winner'] == country)
+            total_matches = country_data['winner'].size
+            win_loss_records.append((total_matches, num_wins, country))
     win_loss_records.sort(key=lambda x:x[1]/x[0], reverse=True)
     win_loss_df = pd.DataFrame.from_records(win_loss_records, columns=['total_matches', "num_wins", "country"])
     
@@ -49,7 +58,6 @@ def winloss(full_data: pd.DataFrame):
 
 
 if __name__ == "__main__":
-    BASE_PATH = os.getcwd()
-    DATABASE_PATH = os.path.join(BASE_PATH, "DataProcessing", "result_post_step.csv")
-    database = pd.read_csv(DATABASE_PATH)
+    database = load_database(columns=['year', 'team_A', 'team_B', 'winner', 'toss_winner', 'toss_decision'],
+                             min_year=2016)
     winloss(database)
\ No newline at end of file